@@ -1,15 +1,24 @@
-from newsapi import NewsApiClient
+from newsapi import NewsApiClient, const as newsapi_const
 from typing import List, Dict, Optional
+import logging
 import os 
 from dotenv import load_dotenv # Import load_dotenv
 
+from shared.articles import Article, from_newsapi
+
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# NEWS_API_URL points the client at a local stand-in (benchmarks/fake_upstreams.py)
+if os.getenv("NEWS_API_URL"):
+    newsapi_const.EVERYTHING_URL = os.getenv("NEWS_API_URL").rstrip("/") + "/v2/everything"
+
 class ArticleFetcher:
     def __init__(self, api_key: str) -> None:
         self.newsapi = NewsApiClient(api_key=api_key)
-        self.all_articles: List[Dict] = []
+        self.all_articles: List[Article] = []
 
     def getting_search_result(
         self, 
@@ -17,8 +26,20 @@ class ArticleFetcher:
         language: str = 'en', 
         sort_by: str = 'relevancy', 
         page_size: int = 10, 
-        page: int = 1
-    ) -> List[Dict]:
+        page: int = 1,
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None,
+        raise_errors: bool = False
+    ) -> List[Article]:
+        """
+        Search NewsAPI's /v2/everything.
+
+        Args:
+            from_date, to_date: Inclusive publishedAt bounds, YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS.
+            raise_errors (bool): Re-raise NewsAPI and network errors instead of
+                                 returning [], for callers that must tell an
+                                 error from an empty result.
+        """
         if not search_keyword:
             return []
 
@@ -28,32 +49,36 @@ class ArticleFetcher:
                 language=language,
                 sort_by=sort_by,
                 page_size=page_size,
-                page=page
+                page=page,
+                from_param=from_date,
+                to=to_date
             )
 
-            self.all_articles = response.get('articles', [])
+            self.all_articles = [from_newsapi(article) for article in response.get('articles', [])]
             return self.all_articles
         
         except Exception as e:
-            print(f"An error occurred while fetching articles: {e}")
+            logger.error("NewsAPI search failed", extra={"keyword": search_keyword, "error": str(e)})
+            if raise_errors:
+                raise
             return []
     
     def store_mongodb(self) -> bool:
         # TODO: Implement MongoDB storage
         return False
 
-    def get_articles(self) -> List[Dict]:
+    def get_articles(self) -> List[Article]:
         """
         Returns the current articles stored in the fetcher.
         """
         return self.all_articles
 
-    def display_articles(self, articles: List[Dict]) -> None:
+    def display_articles(self, articles: List[Article]) -> None:
         """
         Prints the details of the fetched articles in a readable format.
 
         Args:
-            articles (list): A list of article dictionaries returned by fetch_articles.
+            articles (list): A list of Articles returned by getting_search_result.
         """
         if not articles:
             print("No articles to display.")
@@ -61,16 +86,16 @@ class ArticleFetcher:
 
         for i, article in enumerate(articles):
             print(f"\n--- Article {i+1} ---")
-            print(f"Title: {article.get('title', 'N/A')}")
-            print(f"Source: {article.get('source', {}).get('name', 'N/A')}")
-            print(f"Author: {article.get('author', 'N/A')}")
-            print(f"Published At: {article.get('publishedAt', 'N/A')}")
-            print(f"Description: {article.get('description', 'N/A')}")
-            print(f"URL: {article.get('url', 'N/A')}")
+            print(f"Title: {article.title or 'N/A'}")
+            print(f"Source: {article.source or 'N/A'}")
+            print(f"Author: {article.author or 'N/A'}")
+            print(f"Published At: {article.published_at or 'N/A'}")
+            print(f"Description: {article.description or 'N/A'}")
+            print(f"URL: {article.url or 'N/A'}")
             print("-" * 30)
 
     def get_url_references(self) -> List[str]:
-        return [article.get("url") for article in self.all_articles] 
+        return [article.url for article in self.all_articles] 
     
 
 
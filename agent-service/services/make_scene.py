@@ -5,6 +5,9 @@ import numpy as np
 from dotenv import load_dotenv
 import os
 
+from shared.articles import Article
+from shared.instrumentation import record_llm_usage, span
+
 load_dotenv()
 
 class CreateASummary:
@@ -17,19 +20,24 @@ class CreateASummary:
     def __init__(self):
         self.summary = None
         self.references = []
-        # Initialize Gemini
-        genai.configure(api_key=os.getenv('GOOGLE_API_KEY'))
+        # Initialize Gemini; GEMINI_API_ENDPOINT points it at a local stand-in
+        endpoint = os.getenv('GEMINI_API_ENDPOINT')
+        genai.configure(
+            api_key=os.getenv('GOOGLE_API_KEY'),
+            transport='rest' if endpoint else None,
+            client_options={'api_endpoint': endpoint} if endpoint else None
+        )
         self.gemini_model = genai.GenerativeModel('gemini-pro')
         
     def process_articles(self, 
-                        articles: List[Dict], 
+                        articles: List[Article], 
                         embeddings: np.ndarray,
                         threshold: float = 0.7) -> Dict:
         """
         Process articles about the same topic from different sources and generate a comprehensive summary
         
         Args:
-            articles: List of article dictionaries about the same topic
+            articles: List of articles about the same topic
             embeddings: Pre-computed embeddings for the articles
             threshold: Similarity threshold (not used in this version as articles are about same topic)
             
@@ -42,45 +50,28 @@ class CreateASummary:
         if len(articles) != len(embeddings):
             return {"error": "Number of articles and embeddings must match"}
             
-        # Prepare context for Gemini with all articles
-        context = """Please create a comprehensive summary of the following news articles about the same topic.
-        Focus on:
-        1. Key developments and facts that are consistent across sources
-        2. Unique perspectives or additional details from each source
-        3. Timeline of events if mentioned
-        4. Different viewpoints or reactions if present
-        
-        Articles:
-        """
-        
-        for i, article in enumerate(articles, 1):
-            context += f"\nSource {i} - {article.get('source', {}).get('name', 'N/A')}:\n"
-            context += f"Title: {article.get('title', 'N/A')}\n"
-            context += f"Description: {article.get('description', 'N/A')}\n"
-            if article.get('content'):
-                context += f"Content: {article.get('content', 'N/A')}\n"
-            context += f"Published: {article.get('publishedAt', 'N/A')}\n"
-            
         # Generate comprehensive summary using Gemini
-        response = self.gemini_model.generate_content(
-            context + "\nCreate a comprehensive summary that combines information from all sources, highlighting both common facts and unique perspectives."
-        )
+        with span("summarize"):
+            response = self.gemini_model.generate_content(self.build_summary_prompt(articles))
+        record_llm_usage('gemini-pro', response)
         
-        # Add references
+        # Add references as plain dicts; the summary is returned and stored as JSON
         for article in articles:
             self.references.append({
-                "title": article.get("title", "N/A"),
-                "source": article.get("source", {}).get("name", "N/A"),
-                "author": article.get("author", "N/A"),
-                "published_at": article.get("publishedAt", "N/A"),
-                "url": article.get("url", "N/A")
+                "title": article.title or "N/A",
+                "source": article.source or "N/A",
+                "author": article.author or "N/A",
+                "published_at": article.published_at or "N/A",
+                "url": article.url or "N/A"
             })
         
         # Generate a final title using Gemini
         title_prompt = f"""Based on this comprehensive summary of multiple sources, create a clear and informative title that captures the main story:
         
         {response.text}"""
-        title_response = self.gemini_model.generate_content(title_prompt)
+        with span("summarize_title"):
+            title_response = self.gemini_model.generate_content(title_prompt)
+        record_llm_usage('gemini-pro', title_response)
         
         self.summary = {
             "title": title_response.text.strip(),
@@ -92,6 +83,34 @@ class CreateASummary:
         
         return self.summary
     
+    @staticmethod
+    def build_summary_prompt(articles: List[Article]) -> str:
+        """
+        Build the Gemini prompt covering every article's source, title,
+        description, content and publication date.
+        """
+        # Collected in a list and joined once; the articles' content can be long
+        parts = ["""Please create a comprehensive summary of the following news articles about the same topic.
+        Focus on:
+        1. Key developments and facts that are consistent across sources
+        2. Unique perspectives or additional details from each source
+        3. Timeline of events if mentioned
+        4. Different viewpoints or reactions if present
+        
+        Articles:
+        """]
+        
+        for i, article in enumerate(articles, 1):
+            parts.append(f"\nSource {i} - {article.source or 'N/A'}:\n")
+            parts.append(f"Title: {article.title or 'N/A'}\n")
+            parts.append(f"Description: {article.description or 'N/A'}\n")
+            if article.content:
+                parts.append(f"Content: {article.content}\n")
+            parts.append(f"Published: {article.published_at or 'N/A'}\n")
+
+        parts.append("\nCreate a comprehensive summary that combines information from all sources, highlighting both common facts and unique perspectives.")
+        return "".join(parts)
+
     def get_summary(self) -> Dict:
         """Return the generated summary"""
         if not self.summary:
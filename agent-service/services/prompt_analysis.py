@@ -1,9 +1,13 @@
 
+import logging
+
 from keybert import KeyBERT
 
-print("Downloading Bert... \n")
+logger = logging.getLogger(__name__)
+
+logger.info("loading KeyBERT model", extra={"model": "all-MiniLM-L6-v2"})
 shared_model = KeyBERT(model='all-MiniLM-L6-v2')
-print("Ending Downloading part \n")
+logger.info("KeyBERT model loaded")
 class PromptAnalysis:
     def __init__(self, input_text):
         self.input_text = input_text
@@ -0,0 +1,498 @@
+import json
+import math
+import mmap
+import os
+import re
+import threading
+from heapq import nlargest
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+from shared.articles import Article
+
+# Same defaults as the CountVectorizer KeyBERT builds for PromptAnalysis
+# (token_pattern, lowercase, stop_words="english", keyphrase_ngram_range=(1, 2)),
+# so an extracted keyword can be looked up in the index as-is.
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+PHRASE_PATTERN = re.compile(r'"([^"]+)"')
+NGRAM_RANGE = (1, 2)
+
+Posting = Tuple[int, List[int]]
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, split and drop English stop words, like CountVectorizer."""
+    return [
+        token for token in TOKEN_PATTERN.findall(text.lower())
+        if token not in ENGLISH_STOP_WORDS
+    ]
+
+
+def ngram_terms(tokens: List[str], ngram_range: Tuple[int, int] = NGRAM_RANGE) -> Iterator[Tuple[str, int]]:
+    """Yield every (term, position) n-gram of the token stream."""
+    min_n, max_n = ngram_range
+    for n in range(min_n, max_n + 1):
+        for position in range(len(tokens) - n + 1):
+            yield " ".join(tokens[position:position + n]), position
+
+
+def _encode_varint(value: int, out: bytearray) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _decode_varint(buf, pos: int) -> Tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def encode_postings(postings: List[Posting]) -> bytes:
+    """
+    Compress a posting list sorted by doc id.
+
+    Layout is varint(doc count) followed by, for each doc, varint(doc id gap),
+    varint(term frequency) and the delta-encoded positions.
+    """
+    out = bytearray()
+    _encode_varint(len(postings), out)
+    last_doc = 0
+    for doc_id, positions in postings:
+        _encode_varint(doc_id - last_doc, out)
+        last_doc = doc_id
+        _encode_varint(len(positions), out)
+        last_position = 0
+        for position in positions:
+            delta = position - last_position
+            # Almost every gap fits in one byte; skip the call in that case.
+            if delta < 0x80:
+                out.append(delta)
+            else:
+                _encode_varint(delta, out)
+            last_position = position
+    return bytes(out)
+
+
+def decode_postings(buf, pos: int = 0) -> List[Posting]:
+    """Inverse of encode_postings."""
+    count, pos = _decode_varint(buf, pos)
+    postings: List[Posting] = []
+    doc_id = 0
+    for _ in range(count):
+        gap, pos = _decode_varint(buf, pos)
+        doc_id += gap
+        tf, pos = _decode_varint(buf, pos)
+        positions = []
+        position = 0
+        for _ in range(tf):
+            byte = buf[pos]
+            if byte < 0x80:
+                pos += 1
+                position += byte
+            else:
+                delta, pos = _decode_varint(buf, pos)
+                position += delta
+            positions.append(position)
+        postings.append((doc_id, positions))
+    return postings
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "wb") as fh:
+        fh.write(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp_path, path)
+
+
+class Segment:
+    """
+    An immutable on-disk slice of the index.
+
+    Each segment is a `<name>.post` file of compressed posting lists plus a
+    `<name>.meta.json` file holding the term dictionary and per-doc metadata.
+    """
+    def __init__(self, directory: Path, name: str) -> None:
+        self.name = name
+        self.directory = directory
+        meta = json.loads((directory / f"{name}.meta.json").read_text(encoding="utf-8"))
+        # term -> [offset, length, doc frequency]
+        self.terms: Dict[str, List[int]] = meta["terms"]
+        self.docs: Dict[int, Dict] = {int(doc_id): doc for doc_id, doc in meta["docs"].items()}
+
+        with open(directory / f"{name}.post", "rb") as fh:
+            if os.fstat(fh.fileno()).st_size:
+                self._postings = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self._postings = b""
+
+    @classmethod
+    def write(cls, directory: Path, name: str, docs: Dict[int, Dict],
+              postings: Dict[str, List[Posting]]) -> "Segment":
+        """Serialize an in-memory segment and open it back from disk."""
+        blob = bytearray()
+        terms: Dict[str, List[int]] = {}
+        for term in sorted(postings):
+            encoded = encode_postings(postings[term])
+            terms[term] = [len(blob), len(encoded), len(postings[term])]
+            blob.extend(encoded)
+
+        # Postings first: a meta file only ever points at a complete .post file.
+        _write_atomic(directory / f"{name}.post", bytes(blob))
+        meta = {"terms": terms, "docs": {str(doc_id): doc for doc_id, doc in docs.items()}}
+        _write_atomic(directory / f"{name}.meta.json", json.dumps(meta).encode("utf-8"))
+        return cls(directory, name)
+
+    def doc_freq(self, term: str) -> int:
+        entry = self.terms.get(term)
+        return entry[2] if entry else 0
+
+    def postings(self, term: str) -> List[Posting]:
+        entry = self.terms.get(term)
+        if not entry:
+            return []
+        offset, length, _ = entry
+        return decode_postings(self._postings[offset:offset + length])
+
+    def iter_postings(self) -> Iterator[Tuple[str, List[Posting]]]:
+        for term in self.terms:
+            yield term, self.postings(term)
+
+    def phrase_docs(self, tokens: List[str]) -> Set[int]:
+        """Return the doc ids in which `tokens` occur at consecutive positions."""
+        lists = [dict(self.postings(token)) for token in tokens]
+        if not lists or not all(lists):
+            return set()
+
+        matches = set()
+        for doc_id in set(lists[0]).intersection(*lists[1:]):
+            starts = set(lists[0][doc_id])
+            for offset, token_postings in enumerate(lists[1:], 1):
+                starts &= {position - offset for position in token_postings[doc_id]}
+                if not starts:
+                    break
+            if starts:
+                matches.add(doc_id)
+        return matches
+
+    def remove_files(self) -> None:
+        for suffix in (".post", ".meta.json"):
+            try:
+                (self.directory / f"{self.name}{suffix}").unlink()
+            except OSError:
+                # Still mapped by an in-flight search on some platforms; the
+                # manifest no longer references it so it is ignored on load.
+                pass
+
+
+class ArticleIndex:
+    """
+    BM25-ranked inverted index over fetched and scraped articles.
+
+    Every call to add_articles() writes one new segment. Segments are
+    grouped into size tiers a factor of merge_factor apart; once a tier
+    holds merge_factor segments they are merged on a background thread into
+    one segment of the next tier. A document is rewritten about once per
+    tier, so write amplification grows with log(index size) rather than
+    with the index size. The live segment list and deleted doc ids are
+    tracked in manifest.json.
+    """
+    def __init__(self, directory: str, merge_factor: int = 8, k1: float = 1.2, b: float = 0.75) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.merge_factor = merge_factor
+        self.k1 = k1
+        self.b = b
+
+        self._lock = threading.RLock()
+        self._merge_thread: Optional[threading.Thread] = None
+
+        manifest_path = self.directory / "manifest.json"
+        manifest = {"next_doc_id": 1, "next_segment": 1, "segments": [], "deleted": []}
+        if manifest_path.exists():
+            manifest.update(json.loads(manifest_path.read_text(encoding="utf-8")))
+
+        self._next_doc_id: int = manifest["next_doc_id"]
+        self._next_segment: int = manifest["next_segment"]
+        self._deleted: Set[int] = set(manifest["deleted"])
+        self._segments: List[Segment] = [Segment(self.directory, name) for name in manifest["segments"]]
+
+        self._url_to_doc: Dict[str, int] = {}
+        self._doc_lengths: Dict[int, int] = {}
+        for segment in self._segments:
+            for doc_id, doc in segment.docs.items():
+                if doc_id in self._deleted:
+                    continue
+                self._doc_lengths[doc_id] = doc["length"]
+                if doc.get("url"):
+                    self._url_to_doc[doc["url"]] = doc_id
+        self._total_length = sum(self._doc_lengths.values())
+        # Docs written to segments by this process, merges included
+        self._docs_written = 0
+
+    @staticmethod
+    def _article_text(article: Article) -> str:
+        parts = [article.title, article.description, article.content]
+        return "\n".join(part for part in parts if part)
+
+    @staticmethod
+    def _article_meta(article: Article, length: int) -> Dict:
+        return {
+            "url": article.url,
+            "title": article.title,
+            "source": article.source,
+            "published_at": article.published_at,
+            "length": length,
+        }
+
+    def _write_manifest(self) -> None:
+        manifest = {
+            "next_doc_id": self._next_doc_id,
+            "next_segment": self._next_segment,
+            "segments": [segment.name for segment in self._segments],
+            "deleted": sorted(self._deleted),
+        }
+        _write_atomic(self.directory / "manifest.json", json.dumps(manifest).encode("utf-8"))
+
+    def _new_segment_name(self) -> str:
+        name = f"seg_{self._next_segment:06d}"
+        self._next_segment += 1
+        return name
+
+    def _delete_doc(self, doc_id: int) -> None:
+        self._deleted.add(doc_id)
+        self._total_length -= self._doc_lengths.pop(doc_id, 0)
+
+    def add_articles(self, articles: Iterable[Article]) -> int:
+        """
+        Index a batch of articles as a new segment.
+
+        Re-indexing a URL replaces the previous version of that document.
+
+        Args:
+            articles: Articles with at least a title, description or content.
+
+        Returns:
+            Number of articles written to the index.
+        """
+        # Last occurrence wins when a batch repeats a URL.
+        unique: Dict[str, Article] = {}
+        for i, article in enumerate(articles):
+            unique[article.url or f"__no_url_{i}"] = article
+
+        tokenized = [(article, tokenize(self._article_text(article))) for article in unique.values()]
+        tokenized = [(article, tokens) for article, tokens in tokenized if tokens]
+        if not tokenized:
+            return 0
+
+        with self._lock:
+            docs: Dict[int, Dict] = {}
+            postings: Dict[str, List[Posting]] = {}
+            for article, tokens in tokenized:
+                doc_id = self._next_doc_id
+                self._next_doc_id += 1
+                docs[doc_id] = self._article_meta(article, len(tokens))
+
+                doc_terms: Dict[str, List[int]] = {}
+                for term, position in ngram_terms(tokens):
+                    doc_terms.setdefault(term, []).append(position)
+                for term, positions in doc_terms.items():
+                    postings.setdefault(term, []).append((doc_id, positions))
+
+            segment = Segment.write(self.directory, self._new_segment_name(), docs, postings)
+            self._docs_written += len(docs)
+
+            for doc_id, doc in docs.items():
+                url = doc.get("url")
+                if url and url in self._url_to_doc:
+                    self._delete_doc(self._url_to_doc[url])
+                if url:
+                    self._url_to_doc[url] = doc_id
+                self._doc_lengths[doc_id] = doc["length"]
+                self._total_length += doc["length"]
+
+            self._segments.append(segment)
+            self._write_manifest()
+            self._maybe_schedule_merge()
+
+        return len(docs)
+
+    def search(self, query: str, limit: int = 10) -> List[Dict]:
+        """
+        Rank documents against `query` with BM25.
+
+        Double-quoted parts of the query are phrase constraints: a document
+        only matches if it contains each phrase verbatim (after stop word
+        removal). All query unigrams and bigrams contribute to the score.
+
+        Args:
+            query: Free text, optionally with "quoted phrases".
+            limit: Maximum number of results.
+
+        Returns:
+            Result dicts with doc_id, score, url, title, source and published_at.
+        """
+        phrases = [tokenize(phrase) for phrase in PHRASE_PATTERN.findall(query)]
+        phrases = [tokens for tokens in phrases if tokens]
+
+        query_terms: Set[str] = {term for term, _ in ngram_terms(tokenize(PHRASE_PATTERN.sub(" ", query)))}
+        for tokens in phrases:
+            query_terms.update(term for term, _ in ngram_terms(tokens))
+        if not query_terms:
+            return []
+
+        with self._lock:
+            segments = list(self._segments)
+            deleted = set(self._deleted)
+            doc_count = len(self._doc_lengths)
+            total_length = self._total_length
+
+        if not doc_count:
+            return []
+        avg_length = total_length / doc_count
+
+        idf: Dict[str, float] = {}
+        for term in query_terms:
+            df = sum(segment.doc_freq(term) for segment in segments)
+            if df:
+                idf[term] = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+
+        scores: Dict[int, float] = {}
+        doc_meta: Dict[int, Dict] = {}
+        for segment in segments:
+            allowed: Optional[Set[int]] = None
+            for tokens in phrases:
+                matched = segment.phrase_docs(tokens)
+                allowed = matched if allowed is None else allowed & matched
+                if not allowed:
+                    break
+            if allowed is not None and not allowed:
+                continue
+
+            for term, term_idf in idf.items():
+                for doc_id, positions in segment.postings(term):
+                    if doc_id in deleted or (allowed is not None and doc_id not in allowed):
+                        continue
+                    tf = len(positions)
+                    length = segment.docs[doc_id]["length"]
+                    norm = tf + self.k1 * (1 - self.b + self.b * length / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + term_idf * tf * (self.k1 + 1) / norm
+                    doc_meta[doc_id] = segment.docs[doc_id]
+
+        results = []
+        # Ties go to the older doc, so merges (which reorder segments) do not reorder results
+        for doc_id, score in nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0])):
+            meta = doc_meta[doc_id]
+            results.append({
+                "doc_id": doc_id,
+                "score": round(score, 4),
+                "url": meta.get("url"),
+                "title": meta.get("title"),
+                "source": meta.get("source"),
+                "published_at": meta.get("published_at"),
+            })
+        return results
+
+    def _tier(self, segment: Segment) -> int:
+        size = len(segment.docs)
+        tier = 0
+        while size >= self.merge_factor:
+            size //= self.merge_factor
+            tier += 1
+        return tier
+
+    def _merge_candidates(self) -> List[Segment]:
+        """The merge_factor oldest segments of the smallest full tier, or []."""
+        tiers: Dict[int, List[Segment]] = {}
+        for segment in self._segments:
+            tiers.setdefault(self._tier(segment), []).append(segment)
+        for tier in sorted(tiers):
+            if len(tiers[tier]) >= self.merge_factor:
+                return tiers[tier][:self.merge_factor]
+        return []
+
+    def _maybe_schedule_merge(self) -> None:
+        if not self._merge_candidates():
+            return
+        if self._merge_thread is not None and self._merge_thread.is_alive():
+            return
+        self._start_merge_thread()
+
+    def _start_merge_thread(self) -> None:
+        self._merge_thread = threading.Thread(target=self._merge_segments, name="search-index-merge", daemon=True)
+        self._merge_thread.start()
+
+    def _merge_segments(self) -> None:
+        with self._lock:
+            to_merge = self._merge_candidates()
+            if not to_merge:
+                return
+            deleted = set(self._deleted)
+            name = self._new_segment_name()
+
+        docs: Dict[int, Dict] = {}
+        postings: Dict[str, List[Posting]] = {}
+        purged: Set[int] = set()
+        for segment in to_merge:
+            for doc_id, doc in segment.docs.items():
+                if doc_id in deleted:
+                    purged.add(doc_id)
+                else:
+                    docs[doc_id] = doc
+            for term, term_postings in segment.iter_postings():
+                live = [posting for posting in term_postings if posting[0] not in deleted]
+                if live:
+                    postings.setdefault(term, []).extend(live)
+        for term_postings in postings.values():
+            term_postings.sort(key=lambda posting: posting[0])
+
+        merged = Segment.write(self.directory, name, docs, postings)
+
+        with self._lock:
+            merged_names = {segment.name for segment in to_merge}
+            self._segments = [segment for segment in self._segments if segment.name not in merged_names]
+            self._segments.append(merged)
+            self._docs_written += len(docs)
+            # Docs deleted while the merge ran are still in `merged`; keep their tombstones.
+            self._deleted -= purged
+            self._write_manifest()
+
+        for segment in to_merge:
+            segment.remove_files()
+
+        with self._lock:
+            # The merged segment may have filled the next tier
+            if self._merge_candidates():
+                self._start_merge_thread()
+
+    def wait_for_merges(self) -> None:
+        """Block until no background merge is running."""
+        while True:
+            thread = self._merge_thread
+            if thread is None or not thread.is_alive() or thread is threading.current_thread():
+                return
+            thread.join()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "documents": len(self._doc_lengths),
+                "segments": len(self._segments),
+                "deleted": len(self._deleted),
+                "docs_written": self._docs_written,
+            }
+
+
+# Create a singleton instance for the FastAPI service
+article_index = ArticleIndex(os.getenv("SEARCH_INDEX_DIR", "data/search_index"))
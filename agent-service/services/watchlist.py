@@ -0,0 +1,370 @@
+import asyncio
+import logging
+import random
+import sqlite3
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from newsapi.newsapi_exception import NewsAPIException
+
+from services.api_news import ArticleFetcher
+from shared.articles import Article
+from shared.instrumentation import record_cache, span
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS watches (
+    keyword TEXT PRIMARY KEY,
+    language TEXT NOT NULL,
+    high_water TEXT,
+    window_to TEXT,
+    next_page INTEGER,
+    page_failures INTEGER NOT NULL DEFAULT 0,
+    last_polled_at REAL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS seen_urls (
+    keyword TEXT NOT NULL,
+    url TEXT NOT NULL,
+    published_at TEXT NOT NULL,
+    PRIMARY KEY (keyword, url)
+);
+"""
+
+# Added after the first release of the table
+MIGRATED_COLUMNS = {"window_to": "TEXT", "next_page": "INTEGER", "page_failures": "INTEGER NOT NULL DEFAULT 0"}
+
+# NewsAPI errors that paging further into the same window cannot get past,
+# e.g. the developer plan's 100-result cap
+FINAL_ERROR_CODES = {"maximumResultsReached", "parameterInvalid", "parametersMissing"}
+
+
+def _timestamp(article: Article) -> str:
+    # NewsAPI's `from` only takes YYYY-MM-DDTHH:MM:SS, so marks are kept at that precision
+    return (article.published_at or "")[:19]
+
+
+def _is_final(error: Exception) -> bool:
+    if isinstance(error, NewsAPIException):
+        return error.get_exception().get("code") in FINAL_ERROR_CODES
+    # Raised by the client's own argument checks
+    return isinstance(error, (ValueError, TypeError))
+
+
+class Watchlist:
+    """
+    Keywords polled incrementally against NewsAPI.
+
+    Each keyword keeps a high-water mark (the newest publishedAt seen) and
+    the URLs published at or after it. A poll only asks NewsAPI for
+    articles from the mark onwards and drops URLs already seen, so
+    steady-state polls return only what is new.
+
+    The mark only moves once everything since it has been read. A poll cut
+    short by a NewsAPI error or by max_pages leaves it in place and pins
+    the window it was reading (`window_to`, the newest publishedAt it saw)
+    along with the next page to read; later polls continue that window
+    from that page, then read anything newer from the advanced mark. The
+    very first poll only takes the newest max_pages pages; history older
+    than that is not backfilled.
+
+    A page that fails with a final NewsAPI error, or max_page_failures polls
+    in a row, is given up on: the mark moves past what was read and the
+    skipped range is logged, so one bad page cannot stall the keyword.
+    """
+    def __init__(self, path: str, fetcher: ArticleFetcher, page_size: int = 50, max_pages: int = 5,
+                 max_page_failures: int = 3) -> None:
+        self.fetcher = fetcher
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.max_page_failures = max_page_failures
+
+        # Polls run in worker threads; one at a time so a keyword is never processed twice.
+        # The connection has its own lock, never held across a NewsAPI call, so the
+        # endpoints that only touch the database do not wait on a poll.
+        self._poll_lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(watches)")}
+        with self.conn:
+            for column, column_type in MIGRATED_COLUMNS.items():
+                if column not in columns:
+                    self.conn.execute(f"ALTER TABLE watches ADD COLUMN {column} {column_type}")
+
+    def add(self, keyword: str, language: str = 'en') -> Dict:
+        with self._db_lock, self.conn:
+            self.conn.execute(
+                # Only a duplicate keyword is ignored; other constraint errors surface
+                "INSERT INTO watches (keyword, language, created_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(keyword) DO NOTHING",
+                (keyword, language, time.time())
+            )
+        return self.get(keyword)
+
+    def remove(self, keyword: str) -> bool:
+        with self._db_lock, self.conn:
+            self.conn.execute("DELETE FROM seen_urls WHERE keyword = ?", (keyword,))
+            cursor = self.conn.execute("DELETE FROM watches WHERE keyword = ?", (keyword,))
+        return cursor.rowcount > 0
+
+    def get(self, keyword: str) -> Optional[Dict]:
+        with self._db_lock:
+            row = self.conn.execute("SELECT * FROM watches WHERE keyword = ?", (keyword,)).fetchone()
+        return dict(row) if row else None
+
+    def list(self) -> List[Dict]:
+        with self._db_lock:
+            return [dict(row) for row in self.conn.execute("SELECT * FROM watches ORDER BY keyword")]
+
+    def poll(self, keyword: str) -> List[Article]:
+        """
+        Fetch the articles for `keyword` published since its high-water mark.
+
+        Pages through newest-first results until a page comes back short,
+        then advances the mark. A poll cut short resumes where it stopped on
+        the next call.
+
+        Returns:
+            Only the articles not seen in earlier polls.
+        """
+        with self._poll_lock:
+            return self._poll(keyword)
+
+    def _poll(self, keyword: str) -> List[Article]:
+        watch = self.get(keyword)
+        if watch is None:
+            return []
+        high_water = watch["high_water"]
+        window_to = watch["window_to"]
+        first_page = watch["next_page"] or 1
+        with self._db_lock:
+            seen = {
+                row["url"] for row in
+                self.conn.execute("SELECT url FROM seen_urls WHERE keyword = ?", (keyword,))
+            }
+
+        new_articles: Dict[str, Article] = {}
+        newest_read = window_to
+        finished = False
+        error: Optional[Exception] = None
+        page = first_page
+        for page in range(first_page, first_page + self.max_pages):
+            try:
+                with span("watchlist_poll"):
+                    articles = self.fetcher.getting_search_result(
+                        search_keyword=keyword,
+                        language=watch["language"],
+                        sort_by='publishedAt',
+                        page_size=self.page_size,
+                        page=page,
+                        from_date=high_water,
+                        to_date=window_to,
+                        raise_errors=True
+                    )
+            except Exception as e:
+                # Retried from this page on the next poll, unless given up on below
+                logger.warning("watchlist page failed", extra={"keyword": keyword, "page": page, "error": str(e)})
+                error = e
+                break
+
+            for article in articles:
+                url = article.url
+                newest_read = max(newest_read or "", _timestamp(article))
+                is_new = bool(url) and url not in seen and url not in new_articles \
+                    and (high_water is None or _timestamp(article) >= high_water)
+                record_cache("watchlist_seen", hit=not is_new)
+                if is_new:
+                    new_articles[url] = article
+
+            # `from` already bounds the results, so only a short page ends the read.
+            # Seen URLs are no stopping point: articles sharing the mark's second
+            # come back in any order.
+            if len(articles) < self.page_size:
+                finished = True
+                break
+        else:
+            page += 1
+
+        if high_water is None and new_articles:
+            # First poll: what was read is the starting point
+            finished = True
+
+        page_failures = 0
+        if error is not None:
+            page_failures = (watch["page_failures"] or 0) + 1 if page == first_page else 1
+            if _is_final(error) or page_failures >= self.max_page_failures:
+                logger.warning("watchlist gave up on page; older articles in the window are skipped", extra={
+                    "keyword": keyword, "page": page, "failures": page_failures, "error": str(error),
+                    "skipped_from": high_water, "skipped_to": newest_read
+                })
+                finished = True
+                page_failures = 0
+
+        now = time.time()
+        with self._db_lock, self.conn:
+            if self.conn.execute("SELECT 1 FROM watches WHERE keyword = ?", (keyword,)).fetchone() is None:
+                # Removed while the poll was paging
+                return []
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO seen_urls (keyword, url, published_at) VALUES (?, ?, ?)",
+                [(keyword, url, _timestamp(article)) for url, article in new_articles.items()]
+            )
+            if finished:
+                high_water = max(high_water or "", newest_read or "") or None
+                window_to, next_page = None, None
+                # Only URLs at the mark itself can come back from a `from=high_water` query
+                self.conn.execute(
+                    "DELETE FROM seen_urls WHERE keyword = ? AND published_at < ?", (keyword, high_water or "")
+                )
+            else:
+                # Pin the window so its pages do not shift under newer arrivals
+                window_to = newest_read
+                next_page = page if window_to else None
+            self.conn.execute(
+                "UPDATE watches SET high_water = ?, window_to = ?, next_page = ?, page_failures = ?, "
+                "last_polled_at = ? WHERE keyword = ?",
+                (high_water, window_to, next_page, page_failures, now, keyword)
+            )
+
+        logger.info("polled watchlist keyword", extra={
+            "keyword": keyword, "new_articles": len(new_articles), "high_water": high_water,
+            "window_to": window_to, "next_page": next_page
+        })
+        if finished and watch["window_to"]:
+            # Window done; read what arrived meanwhile from the advanced mark
+            return list(new_articles.values()) + self._poll(keyword)
+        return list(new_articles.values())
+
+
+class PollSchedule:
+    """
+    When each keyword is next due, from the rate its new articles arrive at.
+
+    A keyword is polled every `interval` seconds while articles keep
+    arriving. As they dry up its interval grows, aiming for about
+    `target_articles` new articles per poll, up to `max_interval`. Quiet
+    topics therefore cost a fraction of the NewsAPI calls busy ones do, at
+    the price of hearing about their rare articles later.
+
+    Times are plain seconds from any clock, so the schedule can be driven
+    by a simulated one.
+    """
+    def __init__(self, interval: float, max_interval: Optional[float] = None, target_articles: float = 20,
+                 jitter: float = 0.5, smoothing: float = 0.5) -> None:
+        self.interval = interval
+        self.max_interval = max(max_interval or interval * 8, interval)
+        self.target_articles = target_articles
+        self.jitter = jitter
+        self.smoothing = smoothing
+        # Per keyword: smoothed new articles per second, last poll time, next due time
+        self.rates: Dict[str, float] = {}
+        self.last_polled: Dict[str, float] = {}
+        self.next_due: Dict[str, float] = {}
+
+    def sync(self, keywords: List[str], now: float) -> None:
+        """Track newly watched keywords, spread over one interval, and forget removed ones."""
+        for keyword in keywords:
+            if keyword not in self.next_due:
+                self.next_due[keyword] = now + random.uniform(0, self.interval)
+        for keyword in set(self.next_due) - set(keywords):
+            for state in (self.rates, self.last_polled, self.next_due):
+                state.pop(keyword, None)
+
+    def next(self) -> Optional[Tuple[str, float]]:
+        """The keyword due soonest and when, or None when nothing is watched."""
+        if not self.next_due:
+            return None
+        keyword = min(self.next_due, key=self.next_due.get)
+        return keyword, self.next_due[keyword]
+
+    def interval_for(self, keyword: str) -> float:
+        rate = self.rates.get(keyword)
+        if rate is None:
+            return self.interval
+        if rate <= 0:
+            return self.max_interval
+        return min(max(self.target_articles / rate, self.interval), self.max_interval)
+
+    def record(self, keyword: str, new_articles: int, now: float, caught_up: bool = True) -> None:
+        """
+        Fold a poll's result into the keyword's rate and schedule its next poll.
+        A keyword whose poll was cut short (`caught_up` False) is due again
+        within `interval`, never later.
+        """
+        last = self.last_polled.get(keyword)
+        # The first poll returns the backlog, which says nothing about the rate
+        if last is not None and now > last:
+            rate = new_articles / (now - last)
+            previous = self.rates.get(keyword)
+            self.rates[keyword] = rate if previous is None else \
+                self.smoothing * rate + (1 - self.smoothing) * previous
+        self.last_polled[keyword] = now
+        if caught_up:
+            self.reschedule(keyword, self.interval_for(keyword), now)
+        else:
+            self.next_due[keyword] = now + self.interval * random.uniform(1 - self.jitter, 1)
+
+    def reschedule(self, keyword: str, delay: float, now: float) -> None:
+        self.next_due[keyword] = now + delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+class WatchlistScheduler:
+    """
+    Polls every watched keyword, each at the pace its PollSchedule sets.
+
+    Due times carry random jitter, so NewsAPI sees a steady trickle of
+    calls rather than a burst. New articles are handed to `on_new_articles`.
+    """
+    def __init__(self, watchlist: Watchlist,
+                 on_new_articles: Callable[[str, List[Article]], Awaitable[None]],
+                 interval: float = 900.0, max_interval: Optional[float] = None,
+                 target_articles: float = 20, jitter: float = 0.5) -> None:
+        self.watchlist = watchlist
+        self.on_new_articles = on_new_articles
+        self.interval = interval
+        self.schedule = PollSchedule(interval, max_interval=max_interval, target_articles=target_articles,
+                                     jitter=jitter)
+        self._task: Optional[asyncio.Task] = None
+
+    async def poll_keyword(self, keyword: str) -> List[Article]:
+        # NewsApiClient is blocking; keep it off the event loop
+        articles = await asyncio.to_thread(self.watchlist.poll, keyword)
+        watch = self.watchlist.get(keyword)
+        self.schedule.record(keyword, len(articles), time.monotonic(), caught_up=not (watch and watch["window_to"]))
+        if articles:
+            await self.on_new_articles(keyword, articles)
+        return articles
+
+    async def _run(self) -> None:
+        while True:
+            now = time.monotonic()
+            self.schedule.sync([watch["keyword"] for watch in self.watchlist.list()], now)
+            upcoming = self.schedule.next()
+            if upcoming is None or upcoming[1] > now:
+                # Wake at least once per interval to pick up newly watched keywords
+                await asyncio.sleep(self.interval if upcoming is None else min(self.interval, upcoming[1] - now))
+                continue
+
+            keyword = upcoming[0]
+            try:
+                await self.poll_keyword(keyword)
+            except Exception:
+                logger.exception("watchlist poll failed", extra={"keyword": keyword})
+                self.schedule.reschedule(keyword, self.interval, time.monotonic())
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,14 @@
+# Run from agent-service: python -m pytest tests
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SERVICE_DIR))
+sys.path.append(str(SERVICE_DIR.parent))
+
+# services.api_news refuses to import without a key; tests never call NewsAPI
+os.environ.setdefault("NEWS_API_KEY", "test")
+# The search index module opens a singleton index at import; keep it out of the tree
+os.environ.setdefault("SEARCH_INDEX_DIR", tempfile.mkdtemp(prefix="search_index_"))
@@ -0,0 +1,34 @@
+import json
+
+import pytest
+
+from shared.articles import Article, ArticleBatch, DecodeError, decode_articles, encode
+
+
+def test_article_batch_body():
+    article = Article(title="Fares frozen", url="https://example.com/a", published_at="2024-01-01T00:00:00Z")
+    assert decode_articles(encode(ArticleBatch(articles=[article]))) == [article]
+
+
+def test_newsapi_and_scraped_dicts_keep_their_dates():
+    body = json.dumps({"articles": [
+        {"title": "Fares frozen", "url": "https://example.com/a", "source": {"id": None, "name": "Wire"},
+         "publishedAt": "2024-01-01T00:00:00Z"},
+        {"title": "Line reopens", "url": "https://example.com/b", "source": "Metro",
+         "publication_date": "2024-01-02"},
+    ]}).encode("utf-8")
+    first, second = decode_articles(body)
+    assert (first.source, first.published_at) == ("Wire", "2024-01-01T00:00:00Z")
+    assert (second.source, second.published_at) == ("Metro", "2024-01-02")
+
+
+@pytest.mark.parametrize("body", [
+    b"not json", b"[]", b'{"articles": "none"}', b'{"articles": [1]}',
+    b'{"articles": [{"title": "Fares frozen", "source": 5}]}',
+    b'{"articles": [{"title": 5}]}',
+    b'{"articles": [{"title": "Fares frozen", "source": {"name": ["Wire"]}, "publishedAt": "2024-01-01"}]}',
+    b'{"articles": [{"title": "Fares frozen", "publication_date": 20240101}]}',
+])
+def test_malformed_bodies_are_rejected(body):
+    with pytest.raises(DecodeError):
+        decode_articles(body)
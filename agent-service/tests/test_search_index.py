@@ -0,0 +1,123 @@
+import pytest
+
+from services import search_index
+from services.search_index import ArticleIndex, decode_postings, encode_postings
+from shared.articles import Article
+
+WORDS = ["tram", "ferry", "bus", "metro", "fare", "strike", "bridge", "tunnel", "station", "signal",
+         "depot", "route", "ticket", "driver", "union", "council", "budget", "delay", "track", "platform"]
+
+
+def make_article(i: int, text: str = "") -> Article:
+    words = text or " ".join(WORDS[(i * 7 + j) % len(WORDS)] for j in range(12))
+    return Article(title=f"story{i}", description=words, url=f"https://example.com/{i}")
+
+
+@pytest.fixture
+def manual_merges(monkeypatch):
+    """Stop merges from starting on their own; tests run them with _merge_segments()."""
+    monkeypatch.setattr(ArticleIndex, "_start_merge_thread", lambda self: None)
+
+
+def urls(results):
+    return [result["url"] for result in results]
+
+
+def test_postings_round_trip_with_wide_gaps():
+    postings = [(1, [0, 1, 127]), (129, [128, 300, 70000]), (20000, [5]), (2 ** 32, [2 ** 20, 2 ** 21])]
+    encoded = encode_postings(postings)
+    assert decode_postings(encoded) == postings
+    # A list can be decoded from inside a larger buffer
+    assert decode_postings(b"\xff" + encoded, 1) == postings
+
+
+def test_phrase_must_match_verbatim(tmp_path):
+    index = ArticleIndex(str(tmp_path))
+    index.add_articles([
+        make_article(1, "tram strike closes the bridge"),
+        make_article(2, "strike on the tram network"),
+    ])
+    assert urls(index.search('"tram strike"')) == ["https://example.com/1"]
+    assert set(urls(index.search("tram strike"))) == {"https://example.com/1", "https://example.com/2"}
+    assert index.search('"bridge tram"') == []
+
+
+def test_reindexing_a_url_replaces_the_old_doc(tmp_path):
+    index = ArticleIndex(str(tmp_path))
+    index.add_articles([make_article(1, "ferry fares rise")])
+    index.add_articles([make_article(1, "ferry service cancelled")])
+
+    assert urls(index.search("fares")) == []
+    assert urls(index.search("cancelled")) == ["https://example.com/1"]
+    assert index.stats()["documents"] == 1
+
+
+def test_tombstone_survives_a_concurrent_merge(tmp_path, monkeypatch, manual_merges):
+    index = ArticleIndex(str(tmp_path), merge_factor=2)
+    index.add_articles([make_article(1, "ferry fares rise")])
+    index.add_articles([make_article(2, "metro depot opens")])
+
+    # Re-index article 1 while the merge that contains its old version is being written
+    write = search_index.Segment.write
+    reindexed = []
+
+    def write_during_merge(directory, name, docs, postings):
+        if not reindexed:
+            reindexed.append(True)
+            index.add_articles([make_article(1, "ferry service cancelled")])
+        return write(directory, name, docs, postings)
+
+    monkeypatch.setattr(search_index.Segment, "write", staticmethod(write_during_merge))
+    index._merge_segments()
+    monkeypatch.setattr(search_index.Segment, "write", write)
+
+    assert reindexed
+    assert urls(index.search("fares")) == []
+    assert urls(index.search("cancelled")) == ["https://example.com/1"]
+    reloaded = ArticleIndex(str(tmp_path))
+    assert urls(reloaded.search("fares")) == []
+    assert urls(reloaded.search("ferry")) == ["https://example.com/1"]
+
+
+def test_results_are_identical_after_merging(tmp_path, monkeypatch, manual_merges):
+    index = ArticleIndex(str(tmp_path), merge_factor=3)
+    for batch in range(30):
+        index.add_articles([make_article(batch * 4 + i) for i in range(4)])
+    queries = ["tram", "fare strike", '"bridge tunnel"', "union budget delay"]
+    before = [index.search(query, limit=20) for query in queries]
+    segments_before = index.stats()["segments"]
+
+    monkeypatch.undo()
+    index._maybe_schedule_merge()
+    index.wait_for_merges()
+    assert index.stats()["segments"] < segments_before
+    assert [index.search(query, limit=20) for query in queries] == before
+
+
+def test_reload_from_manifest(tmp_path):
+    index = ArticleIndex(str(tmp_path), merge_factor=2)
+    for i in range(10):
+        index.add_articles([make_article(i)])
+    index.add_articles([make_article(3, "council budget vote")])
+    index.wait_for_merges()
+
+    reloaded = ArticleIndex(str(tmp_path), merge_factor=2)
+    stats, reloaded_stats = index.stats(), reloaded.stats()
+    assert {key: stats[key] for key in ("documents", "segments", "deleted")} == \
+        {key: reloaded_stats[key] for key in ("documents", "segments", "deleted")}
+    for query in ["tram", "council budget", '"fare strike"']:
+        assert reloaded.search(query, limit=20) == index.search(query, limit=20)
+
+
+def test_write_amplification_grows_with_tiers_not_index_size(tmp_path):
+    # Small batches, as /search_news adds them
+    index = ArticleIndex(str(tmp_path), merge_factor=8)
+    for batch in range(400):
+        index.add_articles([make_article(batch * 5 + i) for i in range(5)])
+    index.wait_for_merges()
+
+    stats = index.stats()
+    assert stats["documents"] == 2000
+    # 5-doc segments merge into 40-doc and then 320-doc ones: each doc is written at most 3 times
+    assert stats["docs_written"] <= 3 * stats["documents"]
+    assert stats["segments"] < 3 * 8
@@ -0,0 +1,268 @@
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import pytest
+from newsapi.newsapi_exception import NewsAPIException
+
+from services.watchlist import PollSchedule, Watchlist
+from shared.articles import Article
+
+EPOCH = datetime(2024, 1, 1)
+
+
+class FakeFetcher:
+    """NewsAPI stand-in: newest first, inclusive from/to bounds, paged, with injectable failures."""
+
+    def __init__(self) -> None:
+        self.articles: List[Article] = []
+        # Fail once each
+        self.fail_pages = set()
+        # Fail every time
+        self.broken_pages = set()
+        # Like the developer plan, which refuses to page past 100 results
+        self.max_results: Optional[int] = None
+        self.calls = 0
+
+    def publish(self, count: int, minute: int) -> List[Article]:
+        published = []
+        for _ in range(count):
+            article = Article(
+                url=f"https://example.com/{len(self.articles)}",
+                title=f"story {len(self.articles)}",
+                published_at=(EPOCH + timedelta(minutes=minute)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            )
+            self.articles.append(article)
+            published.append(article)
+        return published
+
+    def getting_search_result(self, search_keyword: str, language: str = 'en', sort_by: str = 'relevancy',
+                              page_size: int = 10, page: int = 1, from_date: Optional[str] = None,
+                              to_date: Optional[str] = None, raise_errors: bool = False) -> List[Article]:
+        self.calls += 1
+        if page in self.fail_pages:
+            self.fail_pages.discard(page)
+            if raise_errors:
+                raise RuntimeError("rateLimited")
+            return []
+        if page in self.broken_pages:
+            raise RuntimeError("unexpectedError")
+        if self.max_results is not None and page * page_size > self.max_results:
+            raise NewsAPIException({"status": "error", "code": "maximumResultsReached", "message": "Upgrade"})
+        matches = sorted(
+            (article for article in self.articles
+             if (from_date is None or article.published_at[:19] >= from_date)
+             and (to_date is None or article.published_at[:19] <= to_date)),
+            key=lambda article: article.published_at, reverse=True
+        )
+        return matches[(page - 1) * page_size:page * page_size]
+
+
+@pytest.fixture
+def fetcher():
+    return FakeFetcher()
+
+
+def make_watchlist(tmp_path, fetcher, **kwargs) -> Watchlist:
+    watchlist = Watchlist(str(tmp_path / "watchlist.sqlite3"), fetcher, **kwargs)
+    watchlist.add("transit")
+    return watchlist
+
+
+def poll_until_quiet(watchlist: Watchlist, limit: int = 10) -> List[List[str]]:
+    rounds = []
+    for _ in range(limit):
+        urls = [article.url for article in watchlist.poll("transit")]
+        rounds.append(urls)
+        if not urls:
+            break
+    return rounds
+
+
+def test_steady_state_returns_only_new_articles(tmp_path, fetcher):
+    watchlist = make_watchlist(tmp_path, fetcher, page_size=5)
+    fetcher.publish(3, minute=0)
+    assert len(watchlist.poll("transit")) == 3
+    assert watchlist.poll("transit") == []
+
+    # Same second as the mark: still new, and the mark's own URLs are not repeated
+    later = fetcher.publish(2, minute=0) + fetcher.publish(2, minute=5)
+    assert {article.url for article in watchlist.poll("transit")} == {article.url for article in later}
+    assert watchlist.get("transit")["high_water"] == "2024-01-01T00:05:00"
+
+
+def test_failed_page_does_not_lose_older_articles(tmp_path, fetcher):
+    watchlist = make_watchlist(tmp_path, fetcher, page_size=5)
+    fetcher.publish(3, minute=0)
+    watchlist.poll("transit")
+
+    burst = [fetcher.publish(1, minute=minute)[0] for minute in range(1, 13)]
+    fetcher.fail_pages = {2}
+    first = watchlist.poll("transit")
+    assert len(first) == 5
+    assert watchlist.get("transit")["high_water"] == "2024-01-01T00:00:00"
+
+    rounds = poll_until_quiet(watchlist)
+    delivered = [article.url for article in first] + [url for urls in rounds for url in urls]
+    assert sorted(delivered) == sorted(article.url for article in burst)
+    assert watchlist.get("transit")["high_water"] == "2024-01-01T00:12:00"
+    assert watchlist.get("transit")["window_to"] is None
+
+
+def test_burst_beyond_max_pages_is_caught_up_across_polls(tmp_path, fetcher):
+    watchlist = make_watchlist(tmp_path, fetcher, page_size=5, max_pages=2)
+    fetcher.publish(1, minute=0)
+    watchlist.poll("transit")
+
+    # Three articles per second, so same-second groups straddle page boundaries
+    burst = []
+    for minute in range(1, 10):
+        burst += fetcher.publish(3, minute=minute)
+    first = watchlist.poll("transit")
+    assert len(first) == 10
+
+    # Articles arriving mid catch-up are delivered once the gap is closed
+    late = fetcher.publish(4, minute=30)
+    rounds = poll_until_quiet(watchlist)
+    delivered = [article.url for article in first] + [url for urls in rounds for url in urls]
+    assert len(delivered) == len(set(delivered))
+    assert set(delivered) == {article.url for article in burst + late}
+
+
+def test_error_on_first_page_changes_nothing(tmp_path, fetcher):
+    watchlist = make_watchlist(tmp_path, fetcher, page_size=5)
+    fetcher.publish(3, minute=0)
+    watchlist.poll("transit")
+    before = watchlist.get("transit")
+
+    fetcher.publish(2, minute=1)
+    fetcher.fail_pages = {1}
+    assert watchlist.poll("transit") == []
+    after = watchlist.get("transit")
+    assert (after["high_water"], after["window_to"]) == (before["high_water"], before["window_to"])
+    assert len(watchlist.poll("transit")) == 2
+
+
+def test_same_second_burst_larger_than_a_poll_is_read_through(tmp_path, fetcher):
+    watchlist = make_watchlist(tmp_path, fetcher, page_size=5, max_pages=2)
+    fetcher.publish(4, minute=0)
+    watchlist.poll("transit")
+
+    # More articles at one second, on both sides of the mark, than a poll can page through
+    burst = fetcher.publish(12, minute=0) + fetcher.publish(25, minute=1)
+    rounds = poll_until_quiet(watchlist)
+    delivered = [url for urls in rounds for url in urls]
+    assert sorted(delivered) == sorted(article.url for article in burst)
+    assert watchlist.get("transit")["high_water"] == "2024-01-01T00:01:00"
+
+
+class BlockingFetcher(FakeFetcher):
+    """Holds every NewsAPI call until `release` is set."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def getting_search_result(self, *args, **kwargs) -> List[Article]:
+        self.started.set()
+        assert self.release.wait(5)
+        return super().getting_search_result(*args, **kwargs)
+
+
+def test_add_and_remove_do_not_wait_for_a_poll(tmp_path):
+    fetcher = BlockingFetcher()
+    watchlist = make_watchlist(tmp_path, fetcher, page_size=5)
+    fetcher.publish(3, minute=0)
+    results = []
+    poller = threading.Thread(target=lambda: results.append(watchlist.poll("transit")))
+    poller.start()
+    assert fetcher.started.wait(5)
+
+    # The poll is blocked inside NewsAPI; database-only calls still go through
+    assert watchlist.add("ferries")["keyword"] == "ferries"
+    assert watchlist.remove("transit")
+    fetcher.release.set()
+    poller.join(5)
+
+    assert results == [[]]
+    assert watchlist.get("transit") is None
+    assert watchlist.conn.execute("SELECT COUNT(*) FROM seen_urls").fetchone()[0] == 0
+
+
+def test_result_cap_skips_the_rest_of_the_window(tmp_path, fetcher):
+    watchlist = make_watchlist(tmp_path, fetcher, page_size=5)
+    fetcher.max_results = 10
+    fetcher.publish(3, minute=0)
+    watchlist.poll("transit")
+
+    burst = [fetcher.publish(1, minute=minute)[0] for minute in range(1, 16)]
+    delivered = watchlist.poll("transit")
+    # The 10 newest are all NewsAPI will return; the mark moves past the rest
+    assert [article.url for article in delivered] == [article.url for article in burst[::-1][:10]]
+    assert watchlist.get("transit")["high_water"] == "2024-01-01T00:15:00"
+    assert watchlist.get("transit")["next_page"] is None
+
+    later = fetcher.publish(2, minute=20)
+    assert {article.url for article in watchlist.poll("transit")} == {article.url for article in later}
+
+
+def test_page_that_keeps_failing_is_given_up_after_retries(tmp_path, fetcher):
+    watchlist = make_watchlist(tmp_path, fetcher, page_size=5, max_page_failures=3)
+    fetcher.publish(3, minute=0)
+    watchlist.poll("transit")
+
+    for minute in range(1, 13):
+        fetcher.publish(1, minute=minute)
+    fetcher.broken_pages = {2}
+    assert len(watchlist.poll("transit")) == 5
+    assert (watchlist.get("transit")["next_page"], watchlist.get("transit")["page_failures"]) == (2, 1)
+    assert watchlist.poll("transit") == []
+    assert (watchlist.get("transit")["next_page"], watchlist.get("transit")["page_failures"]) == (2, 2)
+
+    # Third failure in a row: the window is closed and polling carries on from its top
+    assert watchlist.poll("transit") == []
+    assert watchlist.get("transit")["next_page"] is None
+    assert watchlist.get("transit")["high_water"] == "2024-01-01T00:12:00"
+    later = fetcher.publish(2, minute=20)
+    assert {article.url for article in watchlist.poll("transit")} == {article.url for article in later}
+
+
+def test_schedule_backs_off_quiet_keywords_only():
+    schedule = PollSchedule(interval=900, max_interval=7200, target_articles=20, jitter=0)
+    schedule.sync(["busy", "quiet"], now=0)
+    for keyword in ("busy", "quiet"):
+        schedule.record(keyword, 100, now=0)
+    assert schedule.next_due == {"busy": 900, "quiet": 900}
+
+    for _ in range(6):
+        for keyword, new_articles in (("busy", 40), ("quiet", 0)):
+            schedule.record(keyword, new_articles, now=schedule.next_due[keyword])
+    assert schedule.interval_for("busy") == 900
+    assert schedule.interval_for("quiet") == 7200
+
+    # A poll cut short by max_pages is due again within the base interval
+    now = schedule.next_due["quiet"]
+    schedule.record("quiet", 250, now=now, caught_up=False)
+    assert schedule.next_due["quiet"] == now + 900
+
+
+def test_schedule_tracks_watched_keywords():
+    schedule = PollSchedule(interval=900, jitter=0)
+    schedule.sync(["transit", "ferries"], now=0)
+    assert all(0 <= due <= 900 for due in schedule.next_due.values())
+
+    schedule.record("ferries", 3, now=100)
+    schedule.sync(["transit"], now=200)
+    assert set(schedule.next_due) == {"transit"}
+    assert "ferries" not in schedule.last_polled
+    assert schedule.next() == ("transit", schedule.next_due["transit"])
+
+
+def test_add_surfaces_constraint_errors(tmp_path, fetcher):
+    watchlist = make_watchlist(tmp_path, fetcher)
+    assert watchlist.add("transit", language="de")["language"] == "en"
+    with pytest.raises(sqlite3.IntegrityError):
+        watchlist.add("ferries", language=None)
+    assert watchlist.get("ferries") is None
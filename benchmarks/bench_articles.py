@@ -0,0 +1,115 @@
+"""
+Per-article memory and serialization cost of shared.articles.Article
+against the NewsAPI dicts the services used to pass around.
+
+    python benchmarks/bench_articles.py --articles 10000 --iterations 20
+
+Memory is what a decoded result set keeps alive, measured with tracemalloc.
+Timings cover one whole result set: stdlib json and FastAPI's
+jsonable_encoder (what returning a dict from a handler costs) against the
+msgspec encoder and decoder, plus gzip as GZipMiddleware applies it.
+
+The result set repeats the few corpus articles, so the gzip ratio is far
+better than real traffic will see; its time per megabyte is representative.
+"""
+import argparse
+import gc
+import gzip
+import json
+import tracemalloc
+from typing import Callable, Dict, List
+
+from common import add_service_path, load_corpus_articles, print_table, save_results, summarize, time_calls
+
+add_service_path("agent-service")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+from shared.articles import ArticleBatch, MsgspecResponse, decode_batch, encode, from_newsapi  # noqa: E402
+
+# As configured on GZipMiddleware in agent-service and gateway-service
+GZIP_LEVEL = 6
+
+
+def make_payload(count: int, sources: int) -> bytes:
+    """A NewsAPI /v2/everything response body with `count` distinct articles."""
+    corpus = load_corpus_articles()
+    articles = []
+    for i in range(count):
+        article = dict(corpus[i % len(corpus)])
+        article.pop("page", None)
+        article["url"] = f"{article['url']}?n={i}"
+        article["title"] = f"{article['title']} ({i})"
+        article["source"] = {"id": None, "name": f"Source {i % sources}"}
+        articles.append(article)
+    return json.dumps({"status": "ok", "totalResults": count, "articles": articles}).encode("utf-8")
+
+
+def retained_bytes(build: Callable[[], List]) -> int:
+    """Bytes still allocated once `build()` returns, with the result kept alive."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--articles", type=int, default=10000)
+    parser.add_argument("--sources", type=int, default=40, help="distinct source names in the result set")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    payload = make_payload(args.articles, args.sources)
+    dicts = json.loads(payload)["articles"]
+    articles = [from_newsapi(article) for article in dicts]
+    batch_body = encode(ArticleBatch(articles=articles))
+    dict_body = json.dumps({"articles": dicts}).encode("utf-8")
+
+    memory = {
+        "newsapi_dicts": retained_bytes(lambda: json.loads(payload)["articles"]),
+        "articles_from_newsapi": retained_bytes(
+            lambda: [from_newsapi(article) for article in json.loads(payload)["articles"]]
+        ),
+        "articles_from_batch": retained_bytes(lambda: decode_batch(batch_body)),
+    }
+    print(f"retained memory for {args.articles} articles:")
+    for name, size in memory.items():
+        print(f"  {name:>22}: {size / 1024 / 1024:7.2f} MiB  {size / args.articles:7.0f} B/article")
+
+    sizes = {
+        "dict_json": len(dict_body),
+        "article_json": len(batch_body),
+        "article_json_gzip": len(gzip.compress(batch_body, GZIP_LEVEL)),
+    }
+    print("encoded size: " + "  ".join(f"{name} {size / 1024:.0f} KiB" for name, size in sizes.items()))
+
+    cases: Dict[str, Callable] = {
+        "encode[json.dumps dicts]": lambda: json.dumps({"articles": dicts}).encode("utf-8"),
+        "encode[jsonable_encoder dicts]": lambda: json.dumps(jsonable_encoder({"articles": dicts})).encode("utf-8"),
+        "encode[msgspec articles]": lambda: encode(ArticleBatch(articles=articles)),
+        "encode[MsgspecResponse]": lambda: MsgspecResponse({"status": "success", "results": articles}).body,
+        "decode[json.loads dicts]": lambda: json.loads(dict_body),
+        "decode[json.loads + from_newsapi]": lambda: [from_newsapi(article) for article in json.loads(payload)["articles"]],
+        "decode[msgspec batch]": lambda: decode_batch(batch_body),
+        "gzip[articles json]": lambda: gzip.compress(batch_body, GZIP_LEVEL),
+        "gunzip[articles json]": lambda body=gzip.compress(batch_body, GZIP_LEVEL): gzip.decompress(body),
+    }
+    results = {name: summarize(time_calls(func, args.iterations)) for name, func in cases.items()}
+    print(f"per {args.articles}-article result set:")
+    print_table(results)
+
+    results["memory_bytes"] = {name: size for name, size in memory.items()}
+    results["memory_bytes_per_article"] = {name: round(size / args.articles) for name, size in memory.items()}
+    results["encoded_bytes"] = sizes
+    if not args.no_save:
+        save_results("articles", results, vars(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Indexing throughput and query latency of the agent-service article index.
+
+Run from the repository root:
+
+    python benchmarks/bench_search_index.py --docs 20000 --batch 500
+
+Write amplification is docs written to segments, merges included, per doc
+indexed. Small batches (--batch 5, what /search_news adds) stress it most.
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from common import add_service_path, print_table, save_results, summarize
+
+add_service_path("agent-service")
+
+from services.search_index import ArticleIndex  # noqa: E402
+from shared.articles import Article  # noqa: E402
+
+
+def make_corpus(n_docs: int, vocab_size: int, doc_length: int, seed: int):
+    rng = random.Random(seed)
+    vocab = [f"term{i}" for i in range(vocab_size)]
+    # Zipf-ish weights so the posting lists look like real text
+    weights = [1 / (rank + 1) for rank in range(vocab_size)]
+    for i in range(n_docs):
+        words = rng.choices(vocab, weights=weights, k=doc_length)
+        yield Article(
+            title=" ".join(words[:8]),
+            description=" ".join(words[8:30]),
+            content=" ".join(words[30:]),
+            url=f"https://example.com/article/{i}",
+            source=f"source{i % 50}",
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--docs", type=int, default=10000)
+    parser.add_argument("--batch", type=int, default=500, help="articles per add_articles() call / segment")
+    parser.add_argument("--vocab", type=int, default=20000)
+    parser.add_argument("--doc-length", type=int, default=400, help="tokens per article")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--merge-factor", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    corpus = list(make_corpus(args.docs, args.vocab, args.doc_length, args.seed))
+
+    with tempfile.TemporaryDirectory() as directory:
+        index = ArticleIndex(directory, merge_factor=args.merge_factor)
+
+        per_doc_ms = []
+        start = time.perf_counter()
+        for offset in range(0, len(corpus), args.batch):
+            batch = corpus[offset:offset + args.batch]
+            batch_start = time.perf_counter()
+            index.add_articles(batch)
+            per_doc_ms.append((time.perf_counter() - batch_start) * 1000 / len(batch))
+        indexed = time.perf_counter() - start
+        index.wait_for_merges()
+        merged = time.perf_counter() - start
+
+        size = sum(path.stat().st_size for path in Path(directory).iterdir())
+        write_amplification = index.stats()["docs_written"] / args.docs
+        print(f"indexed {args.docs} docs in {indexed:.2f}s ({args.docs / indexed:.0f} docs/s), "
+              f"{merged:.2f}s including merges")
+        print(f"index size {size / 1e6:.1f} MB, {index.stats()}, write amplification {write_amplification:.2f}")
+
+        rng = random.Random(args.seed + 1)
+        query_kinds = {
+            "single term": lambda doc: doc.title.split()[0],
+            "two terms": lambda doc: " ".join(rng.sample(doc.content.split(), 2)),
+            "phrase": lambda doc: '"' + " ".join(doc.content.split()[5:7]) + '"',
+        }
+        results = {}
+        for kind, make_query in query_kinds.items():
+            latencies = []
+            for _ in range(args.queries):
+                query = make_query(rng.choice(corpus))
+                start = time.perf_counter()
+                index.search(query, limit=10)
+                latencies.append((time.perf_counter() - start) * 1000)
+            results[f"search[{kind}]"] = summarize(latencies)
+
+    results["add_articles[per doc]"] = summarize(per_doc_ms)
+    results["add_articles[per doc]"]["docs_per_second"] = round(args.docs / indexed, 1)
+    results["add_articles[per doc]"]["write_amplification"] = round(write_amplification, 2)
+    print_table(results)
+    if not args.no_save:
+        save_results("search_index", results, vars(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Helpers shared by the benchmark scripts: latency summaries and saving
+results per git revision so runs on different commits can be compared with
+benchmarks/compare.py.
+"""
+import importlib.util
+import json
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BENCH_DIR = REPO_ROOT / "benchmarks"
+CORPUS_DIR = BENCH_DIR / "corpus"
+RESULTS_DIR = BENCH_DIR / "results"
+
+
+def add_service_path(service: str) -> None:
+    """Make `services.*` of one service (and the shared package) importable."""
+    for path in (REPO_ROOT, REPO_ROOT / service):
+        if str(path) not in sys.path:
+            sys.path.insert(0, str(path))
+
+
+def load_module(name: str, path: Path):
+    """
+    Import a single file as `name`.
+
+    agent-service and scrab-service both have a top-level `services`
+    package, so modules from both are loaded by path rather than by name.
+    """
+    if str(REPO_ROOT) not in sys.path:
+        sys.path.insert(0, str(REPO_ROOT))
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_corpus_articles() -> List[Dict]:
+    return json.loads((CORPUS_DIR / "articles.json").read_text(encoding="utf-8"))
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds."""
+    if not samples_ms:
+        return {"n": 0}
+    return {
+        "n": len(samples_ms),
+        "mean": round(sum(samples_ms) / len(samples_ms), 4),
+        "min": round(min(samples_ms), 4),
+        "p50": round(percentile(samples_ms, 50), 4),
+        "p95": round(percentile(samples_ms, 95), 4),
+        "p99": round(percentile(samples_ms, 99), 4),
+    }
+
+
+def time_calls(func, iterations: int, warmup: int = 2) -> List[float]:
+    """Call `func` repeatedly and return per-call latencies in milliseconds."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def wait_until_up(url: str, timeout: float) -> None:
+    """Poll `url` until it answers without a 5xx."""
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=2).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+def git_revision() -> str:
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        return f"{revision}-dirty" if dirty else revision
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def save_results(suite: str, results: Dict[str, Dict], config: Dict) -> Path:
+    """Write `results` to benchmarks/results/<suite>/<timestamp>-<revision>.json."""
+    revision = git_revision()
+    created_at = time.strftime("%Y%m%dT%H%M%S")
+    payload = {
+        "suite": suite,
+        "revision": revision,
+        "created_at": created_at,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "config": config,
+        "results": results,
+    }
+    directory = RESULTS_DIR / suite
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{created_at}-{revision}.json"
+    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    print(f"results saved to {path.relative_to(REPO_ROOT)}")
+    return path
+
+
+def print_table(results: Dict[str, Dict]) -> None:
+    width = max(len(name) for name in results)
+    for name, summary in results.items():
+        extra = f"  {summary['throughput_rps']:.1f} req/s" if "throughput_rps" in summary else ""
+        print(f"{name:>{width}}: p50 {summary['p50']:.3f}ms  p95 {summary['p95']:.3f}ms  "
+              f"p99 {summary['p99']:.3f}ms  mean {summary['mean']:.3f}ms{extra}")
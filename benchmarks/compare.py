@@ -0,0 +1,57 @@
+"""
+Compare two saved benchmark runs and flag regressions.
+
+    python benchmarks/compare.py micro                 # two most recent runs
+    python benchmarks/compare.py micro BASE.json HEAD.json --threshold 0.15
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from common import RESULTS_DIR
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("suite", help="micro, load_test, search_index, ...")
+    parser.add_argument("base", nargs="?", help="results file (default: second most recent)")
+    parser.add_argument("head", nargs="?", help="results file (default: most recent)")
+    parser.add_argument("--metric", default="p50", choices=["mean", "p50", "p95", "p99"])
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    if args.base and args.head:
+        base_path, head_path = Path(args.base), Path(args.head)
+    else:
+        runs = sorted((RESULTS_DIR / args.suite).glob("*.json"))
+        if len(runs) < 2:
+            sys.exit(f"need at least two runs in {RESULTS_DIR / args.suite}")
+        base_path, head_path = runs[-2], runs[-1]
+
+    base = json.loads(base_path.read_text(encoding="utf-8"))
+    head = json.loads(head_path.read_text(encoding="utf-8"))
+    print(f"{args.suite}: {base['revision']} ({base['created_at']}) -> {head['revision']} ({head['created_at']}), {args.metric}")
+
+    regressions = 0
+    names = [name for name in head["results"] if name in base["results"]]
+    width = max((len(name) for name in names), default=0)
+    for name in names:
+        before = base["results"][name].get(args.metric)
+        after = head["results"][name].get(args.metric)
+        if not before or after is None:
+            continue
+        change = (after - before) / before
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif change < -args.threshold:
+            flag = "  faster"
+        print(f"{name:>{width}}: {before:10.3f}ms -> {after:10.3f}ms  {change:+7.1%}{flag}")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
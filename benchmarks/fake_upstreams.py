@@ -0,0 +1,194 @@
+"""
+Local stand-ins for NewsAPI and Gemini so the stack can be exercised
+without API keys.
+
+    python benchmarks/fake_upstreams.py newsapi --port 9001 --latency-ms 80
+    python benchmarks/fake_upstreams.py gemini --port 9002 --latency-ms 800 --error-rate 0.02
+
+Point the services at them with NEWS_API_URL=http://127.0.0.1:9001 and
+GEMINI_API_ENDPOINT=http://127.0.0.1:9002 (any NEWS_API_KEY/GOOGLE_API_KEY).
+The NewsAPI stand-in also serves the saved corpus pages under /pages/ for
+scrape benchmarks.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import HTMLResponse, JSONResponse
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+
+from common import CORPUS_DIR, load_corpus_articles
+
+TITLE_PATTERN = re.compile(r"<title>(.*?)</title>", re.S)
+CANONICAL_PATTERN = re.compile(r'<link rel="canonical" href="([^"]+)"')
+PARAGRAPH_PATTERN = re.compile(r"<p>(.*?)</p>", re.S)
+
+
+class Faults:
+    """Latency and error injection applied to every request."""
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0, seed: Optional[int] = None) -> None:
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+
+    async def apply(self) -> bool:
+        """Sleep for the configured latency; return True if this request should fail."""
+        delay = max(0.0, self.latency_ms + self.rng.uniform(-self.jitter_ms, self.jitter_ms))
+        if delay:
+            await asyncio.sleep(delay / 1000)
+        return self.rng.random() < self.error_rate
+
+
+def create_newsapi_app(faults: Faults) -> FastAPI:
+    app = FastAPI(title="Fake NewsAPI")
+    corpus = load_corpus_articles()
+
+    @app.get("/v2/everything")
+    async def everything(q: str = "", pageSize: int = 20, page: int = 1):
+        if await faults.apply():
+            return JSONResponse(status_code=429, content={
+                "status": "error", "code": "rateLimited", "message": "Injected error from fake NewsAPI"
+            })
+
+        words = set(q.lower().split())
+        matches = [a for a in corpus if words & set(f"{a['title']} {a['description']}".lower().split())]
+        matches = matches or corpus
+
+        # Repeat the corpus to fill the page; distinct URLs so downstream dedup behaves as with real results
+        start = (page - 1) * pageSize
+        articles = []
+        for i in range(start, start + pageSize):
+            article = dict(matches[i % len(matches)])
+            article.pop("page", None)
+            if i >= len(matches):
+                article["url"] = f"{article['url']}?v={i // len(matches)}"
+            articles.append(article)
+        return {"status": "ok", "totalResults": len(matches) * 10, "articles": articles}
+
+    @app.get("/pages/{name}", response_class=HTMLResponse)
+    async def page(name: str):
+        if await faults.apply():
+            raise HTTPException(status_code=503, detail="Injected error from fake page server")
+        pages_dir = (CORPUS_DIR / "pages").resolve()
+        path = (pages_dir / name).resolve()
+        if path.parent != pages_dir or not path.is_file():
+            raise HTTPException(status_code=404, detail="Page not found")
+        return path.read_text(encoding="utf-8")
+
+    return app
+
+
+class GeminiPart(BaseModel):
+    text: Optional[str] = None
+
+class GeminiContent(BaseModel):
+    parts: List[GeminiPart] = []
+    role: Optional[str] = None
+
+class GeminiRequest(BaseModel):
+    contents: List[GeminiContent] = []
+    generationConfig: Optional[Dict] = None
+
+
+def _count_tokens(text: str) -> int:
+    # Roughly four characters per token, close enough for load shaping
+    return max(1, len(text) // 4)
+
+
+def create_gemini_app(faults: Faults) -> FastAPI:
+    app = FastAPI(title="Fake Gemini")
+
+    @app.post("/v1beta/models/{model}:generateContent")
+    async def generate_content(model: str, request: GeminiRequest):
+        if await faults.apply():
+            return JSONResponse(status_code=503, content={
+                "error": {"code": 503, "message": "Injected error from fake Gemini", "status": "UNAVAILABLE"}
+            })
+
+        prompt = "\n".join(part.text or "" for content in request.contents for part in content.parts)
+        wants_json = (request.generationConfig or {}).get("responseMimeType") == "application/json"
+
+        if wants_json:
+            # Mimic the article extraction ScrabberAgent asks for
+            title = TITLE_PATTERN.search(prompt)
+            canonical = CANONICAL_PATTERN.search(prompt)
+            paragraphs = PARAGRAPH_PATTERN.findall(prompt)
+            text = json.dumps([{
+                "title": title.group(1).split(" | ")[0] if title else "Untitled",
+                "author": None,
+                "publication_date": None,
+                "content": "\n".join(paragraphs),
+                "url": canonical.group(1) if canonical else None,
+            }] if paragraphs else [])
+        else:
+            text = f"Fake summary of a {len(prompt)}-character prompt. " * 8
+
+        prompt_tokens = _count_tokens(prompt)
+        completion_tokens = _count_tokens(text)
+        return {
+            "candidates": [{
+                "content": {"parts": [{"text": text}], "role": "model"},
+                "finishReason": "STOP",
+                "index": 0,
+            }],
+            "usageMetadata": {
+                "promptTokenCount": prompt_tokens,
+                "candidatesTokenCount": completion_tokens,
+                "totalTokenCount": prompt_tokens + completion_tokens,
+            },
+        }
+
+    return app
+
+
+def app_from_env() -> FastAPI:
+    """uvicorn factory used with --workers, where each process builds its own app."""
+    faults = Faults(
+        float(os.environ["FAKE_LATENCY_MS"]),
+        float(os.environ["FAKE_JITTER_MS"]),
+        float(os.environ["FAKE_ERROR_RATE"]),
+    )
+    if os.environ["FAKE_UPSTREAM"] == "newsapi":
+        return create_newsapi_app(faults)
+    return create_gemini_app(faults)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a local NewsAPI or Gemini stand-in")
+    parser.add_argument("upstream", choices=["newsapi", "gemini"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9001)
+    parser.add_argument("--latency-ms", type=float, default=0, help="added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="uniform +/- jitter around --latency-ms")
+    parser.add_argument("--error-rate", type=float, default=0, help="fraction of requests that fail")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=1, help="server processes, so the stand-in is not the bottleneck")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    if args.workers > 1:
+        os.environ.update(
+            FAKE_UPSTREAM=args.upstream,
+            FAKE_LATENCY_MS=str(args.latency_ms),
+            FAKE_JITTER_MS=str(args.jitter_ms),
+            FAKE_ERROR_RATE=str(args.error_rate),
+        )
+        uvicorn.run("fake_upstreams:app_from_env", factory=True, workers=args.workers,
+                    app_dir=os.path.dirname(os.path.abspath(__file__)),
+                    host=args.host, port=args.port, log_level="warning")
+        return
+
+    faults = Faults(args.latency_ms, args.jitter_ms, args.error_rate, args.seed)
+    app = create_newsapi_app(faults) if args.upstream == "newsapi" else create_gemini_app(faults)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Closed-loop load generator for POST /prompt_eng on the gateway.
+
+Against an already running stack:
+
+    python benchmarks/load_test.py --url http://localhost:8080 --concurrency 8 --requests 400
+
+Or let it start the fake NewsAPI, agent-service and gateway-service itself
+(ports 9001, 8001 and 8080) with no API keys required:
+
+    python benchmarks/load_test.py --spawn-stack --newsapi-latency-ms 80 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+import httpx
+
+from common import BENCH_DIR, REPO_ROOT, print_table, save_results, summarize, wait_until_up
+
+PROMPTS = [
+    "What did the city council decide about the transit budget?",
+    "How is the drought affecting farmers and their water rights?",
+    "Tell me about the new semiconductor plant expansion",
+    "Why did the museum return bronze artifacts?",
+    "Is the heatwave putting pressure on the power grid?",
+    "What is the new university research centre on machine learning safety?",
+    "Latest news on light rail and late-night bus routes",
+    "Groundwater pumping and land subsidence in the valley",
+]
+
+
+@contextmanager
+def spawned_stack(args) -> Iterator[None]:
+    """Run fake NewsAPI, agent-service and gateway-service as subprocesses."""
+    index_dir = tempfile.TemporaryDirectory()
+    env = dict(
+        os.environ,
+        NEWS_API_KEY="benchmark",
+        NEWS_API_URL="http://127.0.0.1:9001",
+        SEARCH_INDEX_DIR=index_dir.name,
+    )
+    uvicorn = [sys.executable, "-m", "uvicorn", "main:app", "--log-level", "warning"]
+    processes = [
+        subprocess.Popen([
+            sys.executable, str(BENCH_DIR / "fake_upstreams.py"), "newsapi", "--port", "9001",
+            "--latency-ms", str(args.newsapi_latency_ms), "--jitter-ms", str(args.newsapi_jitter_ms),
+            "--error-rate", str(args.error_rate),
+        ], env=env),
+        subprocess.Popen(uvicorn + ["--port", "8001"], cwd=REPO_ROOT / "agent-service", env=env),
+        subprocess.Popen(uvicorn + ["--port", "8080"], cwd=REPO_ROOT / "gateway-service", env=env),
+    ]
+    try:
+        wait_until_up("http://127.0.0.1:9001/docs", 30)
+        # agent-service loads the KeyBERT model at import
+        wait_until_up("http://127.0.0.1:8001/metrics", 300)
+        wait_until_up("http://127.0.0.1:8080/metrics", 30)
+        yield
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        index_dir.cleanup()
+
+
+async def run_load(url: str, concurrency: int, total: int, timeout: float, seed: int) -> Dict:
+    rng = random.Random(seed)
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    remaining = total
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                response = await client.post(f"{url}/prompt_eng", json={"prompt": rng.choice(PROMPTS)})
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            elapsed = (time.perf_counter() - start) * 1000
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == "200":
+                latencies.append(elapsed)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        wall = time.perf_counter() - start
+
+    summary = summarize(latencies)
+    summary["throughput_rps"] = round(len(latencies) / wall, 2)
+    summary["error_rate"] = round(1 - len(latencies) / total, 4)
+    summary["statuses"] = statuses
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8080", help="gateway base URL")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10, help="requests sent before measuring")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--spawn-stack", action="store_true", help="start fake NewsAPI, agent and gateway locally")
+    parser.add_argument("--newsapi-latency-ms", type=float, default=80)
+    parser.add_argument("--newsapi-jitter-ms", type=float, default=20)
+    parser.add_argument("--error-rate", type=float, default=0, help="fake NewsAPI error injection rate")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    @contextmanager
+    def no_stack() -> Iterator[None]:
+        yield
+
+    with spawned_stack(args) if args.spawn_stack else no_stack():
+        if args.warmup:
+            asyncio.run(run_load(args.url, min(args.concurrency, args.warmup), args.warmup, args.timeout, args.seed))
+        summary = asyncio.run(run_load(args.url, args.concurrency, args.requests, args.timeout, args.seed))
+
+    results = {f"prompt_eng[c={args.concurrency}]": summary}
+    if summary["n"]:
+        print_table(results)
+    print(f"statuses: {summary['statuses']}  error rate {summary['error_rate']:.2%}")
+    if not args.no_save:
+        save_results("load_test", results, vars(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Micro-benchmarks for the CPU-bound steps of the pipeline:
+
+- HTMLCleaner.clean_html on each saved corpus page
+- PromptAnalysis.extract_keywords on sample prompts (model load not timed)
+- CreateASummary.build_summary_prompt for small and large article sets
+
+    python benchmarks/micro.py --iterations 50
+    python benchmarks/micro.py --only clean_html
+"""
+import argparse
+from typing import Callable, Dict, List, Tuple
+
+from common import CORPUS_DIR, REPO_ROOT, add_service_path, load_corpus_articles, load_module, print_table, save_results, summarize, time_calls
+from load_test import PROMPTS
+
+
+def clean_html_cases() -> List[Tuple[str, Callable]]:
+    # cleaning_parser imports models.article from scrab-service
+    add_service_path("scrab-service")
+    cleaning_parser = load_module("scrab_cleaning_parser", REPO_ROOT / "scrab-service" / "services" / "cleaning_parser.py")
+    cleaner = cleaning_parser.HTMLCleaner()
+    cases = []
+    for path in sorted((CORPUS_DIR / "pages").glob("*.html")):
+        html_content = path.read_text(encoding="utf-8")
+        cases.append((f"clean_html[{path.stem}]", lambda html_content=html_content: cleaner.clean_html(html_content)))
+    return cases
+
+
+def extract_keywords_cases() -> List[Tuple[str, Callable]]:
+    prompt_analysis = load_module("agent_prompt_analysis", REPO_ROOT / "agent-service" / "services" / "prompt_analysis.py")
+    return [
+        (f"extract_keywords[prompt{i}]", lambda prompt=prompt: prompt_analysis.PromptAnalysis(prompt).extract_keywords())
+        for i, prompt in enumerate(PROMPTS[:3])
+    ]
+
+
+def summary_prompt_cases() -> List[Tuple[str, Callable]]:
+    make_scene = load_module("agent_make_scene", REPO_ROOT / "agent-service" / "services" / "make_scene.py")
+    from shared.articles import from_newsapi
+    corpus = [from_newsapi(article) for article in load_corpus_articles()]
+    cases = []
+    for count in (5, 100):
+        articles = [corpus[i % len(corpus)] for i in range(count)]
+        cases.append((
+            f"build_summary_prompt[{count} articles]",
+            lambda articles=articles: make_scene.CreateASummary.build_summary_prompt(articles)
+        ))
+    return cases
+
+
+GROUPS = {
+    "clean_html": clean_html_cases,
+    "extract_keywords": extract_keywords_cases,
+    "build_summary_prompt": summary_prompt_cases,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the CPU-bound pipeline steps")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--only", choices=sorted(GROUPS), action="append", help="run only these groups")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    results: Dict[str, Dict] = {}
+    for group in args.only or GROUPS:
+        for name, func in GROUPS[group]():
+            results[name] = summarize(time_calls(func, args.iterations))
+
+    print_table(results)
+    if not args.no_save:
+        save_results("micro", results, vars(args))
+
+
+if __name__ == "__main__":
+    main()
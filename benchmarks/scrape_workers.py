@@ -0,0 +1,82 @@
+"""
+Throughput of the scrab-service job queue and worker pool against the saved
+corpus, for an increasing number of worker processes.
+
+    python benchmarks/scrape_workers.py --jobs 2000 --workers 1 2 4 8
+
+Pages are served by the fake NewsAPI stand-in (benchmarks/fake_upstreams.py)
+with --page-latency-ms of simulated network latency. Scaling efficiency is
+throughput at N workers divided by N times the single-worker throughput; on
+a machine with at least N free cores it should stay close to 1.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import BENCH_DIR, CORPUS_DIR, add_service_path, save_results, wait_until_up
+
+add_service_path("scrab-service")
+
+from services.job_queue import JobQueue  # noqa: E402
+from services.scrape_workers import WorkerPool  # noqa: E402
+
+
+def run_once(base_url: str, pages, jobs: int, workers: int, concurrency: int) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "jobs.sqlite3")
+        queue = JobQueue(db_path)
+        # Distinct URLs per job so URL dedup does not collapse the workload
+        queue.submit(f"{base_url}/pages/{pages[i % len(pages)]}?copy={i}" for i in range(jobs))
+
+        pool = WorkerPool(db_path, workers=workers, concurrency=concurrency)
+        start = time.perf_counter()
+        pool.start(drain=True)
+        pool.join()
+        elapsed = time.perf_counter() - start
+
+        stats = queue.stats()
+        queue.close()
+    return {"seconds": round(elapsed, 3), "throughput_rps": round(stats["done"] / elapsed, 2), **stats}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=1000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=8, help="in-flight fetches per worker")
+    parser.add_argument("--page-latency-ms", type=float, default=50)
+    parser.add_argument("--server-workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--port", type=int, default=9011)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    pages = sorted(path.name for path in (CORPUS_DIR / "pages").glob("*.html"))
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = subprocess.Popen([
+        sys.executable, str(BENCH_DIR / "fake_upstreams.py"), "newsapi", "--port", str(args.port),
+        "--latency-ms", str(args.page_latency_ms), "--workers", str(args.server_workers),
+    ])
+    try:
+        wait_until_up(f"{base_url}/docs", 30)
+        results = {}
+        baseline = None
+        for workers in args.workers:
+            result = run_once(base_url, pages, args.jobs, workers, args.concurrency)
+            baseline = baseline or result["throughput_rps"] / workers
+            result["efficiency"] = round(result["throughput_rps"] / (workers * baseline), 3)
+            results[f"workers={workers}"] = result
+            print(f"workers={workers:>3}: {result['throughput_rps']:8.1f} jobs/s  "
+                  f"efficiency {result['efficiency']:.2f}  done {result['done']}  dead {result['dead']}")
+    finally:
+        server.terminate()
+        server.wait()
+
+    if not args.no_save:
+        save_results("scrape_workers", results, vars(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Upstream cost of keeping keywords fresh: watchlist polling with high-water
+marks, at a fixed interval and with PollSchedule's adaptive one, against
+naively re-running the same search every interval.
+
+    python benchmarks/watchlist.py --keywords 20 --polls 96 --arrivals 3
+
+Each keyword gets a simulated NewsAPI feed that grows by a random number of
+articles between intervals. Keyword i's mean is --arrivals scaled by a
+Zipf-like weight (--skew 0 makes every keyword the same), so a few topics
+are busy and most are quiet. All strategies see the same feeds. Reported
+per strategy: NewsAPI calls, articles transferred, articles handed
+downstream that had already been processed, articles missed, and the mean
+delay in minutes from publication to delivery. Articles appear just before
+an interval's polls, so strategies that poll every interval show no delay;
+the column is what adaptive backoff adds.
+"""
+import argparse
+import os
+import random
+import tempfile
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from common import add_service_path, save_results
+
+add_service_path("agent-service")
+# services.api_news refuses to import without a key; no request reaches NewsAPI here
+os.environ.setdefault("NEWS_API_KEY", "benchmark")
+
+from services.watchlist import PollSchedule, Watchlist  # noqa: E402
+from shared.articles import Article, encode  # noqa: E402
+
+EPOCH = datetime(2024, 1, 1)
+
+
+class SimulatedFeed:
+    """Stands in for ArticleFetcher: newest-first, `from`/`to` filtered, paged."""
+
+    def __init__(self) -> None:
+        self.articles: Dict[str, List[Article]] = {}
+        self.calls = 0
+        self.articles_sent = 0
+        self.bytes_sent = 0
+
+    def publish(self, keyword: str, count: int, minute: int) -> None:
+        feed = self.articles.setdefault(keyword, [])
+        for _ in range(count):
+            index = len(feed)
+            feed.append(Article(
+                url=f"https://example.com/{keyword}/{index}",
+                title=f"{keyword} story {index}",
+                description=f"Update {index} on {keyword}",
+                published_at=(EPOCH + timedelta(minutes=minute)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                source="Simulated",
+            ))
+
+    def getting_search_result(self, search_keyword: str, language: str = 'en', sort_by: str = 'relevancy',
+                              page_size: int = 10, page: int = 1, from_date: Optional[str] = None,
+                              to_date: Optional[str] = None, raise_errors: bool = False) -> List[Article]:
+        matches = [
+            article for article in reversed(self.articles.get(search_keyword, []))
+            if (from_date is None or article.published_at[:19] >= from_date)
+            and (to_date is None or article.published_at[:19] <= to_date)
+        ]
+        result = matches[(page - 1) * page_size:page * page_size]
+        self.calls += 1
+        self.articles_sent += len(result)
+        self.bytes_sent += len(encode({"status": "ok", "totalResults": len(matches), "articles": result}))
+        return result
+
+
+def run(args, strategy: str) -> Dict:
+    rng = random.Random(args.seed)
+    # PollSchedule jitters with the global generator
+    random.seed(args.seed)
+    feed = SimulatedFeed()
+    keywords = [f"keyword{i}" for i in range(args.keywords)]
+    weights = [1 / (rank + 1) ** args.skew for rank in range(args.keywords)]
+    means = {keyword: args.arrivals * weight * len(weights) / sum(weights) for keyword, weight in zip(keywords, weights)}
+    for keyword in keywords:
+        # One a minute, so the backlog does not all share the high-water mark's second
+        for minute in range(-args.backlog, 0):
+            feed.publish(keyword, 1, minute)
+
+    processed: Dict[str, set] = {keyword: set() for keyword in keywords}
+    reprocessed = 0
+    delays: List[int] = []
+    # Articles published after a keyword's last poll are not missed, just not fetched yet
+    last_polled: Dict[str, str] = {}
+
+    interval = args.interval_minutes * 60
+    schedule = PollSchedule(interval, max_interval=interval * args.max_interval_factor)
+    schedule.sync(keywords, 0)
+    with tempfile.TemporaryDirectory() as directory:
+        watchlist = Watchlist(os.path.join(directory, "watchlist.sqlite3"), feed, page_size=args.page_size)
+        for keyword in keywords:
+            watchlist.add(keyword)
+
+        for poll in range(args.polls):
+            minute = (poll + 1) * args.interval_minutes
+            for keyword in keywords:
+                # Burst arrivals: usually a few, sometimes many
+                arrivals = int(rng.expovariate(1 / means[keyword])) if means[keyword] else 0
+                feed.publish(keyword, arrivals, minute)
+
+                if strategy == "naive":
+                    articles = feed.getting_search_result(keyword, sort_by='publishedAt', page_size=args.page_size)
+                elif strategy == "watchlist":
+                    articles = watchlist.poll(keyword)
+                elif schedule.next_due[keyword] < minute * 60 + interval / 2:
+                    # Polls land on the nearest simulated interval
+                    articles = watchlist.poll(keyword)
+                    caught_up = watchlist.get(keyword)["window_to"] is None
+                    schedule.record(keyword, len(articles), minute * 60, caught_up=caught_up)
+                else:
+                    continue
+                last_polled[keyword] = (EPOCH + timedelta(minutes=minute)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+                for article in articles:
+                    if article.url in processed[keyword]:
+                        reprocessed += 1
+                    else:
+                        published = datetime.strptime(article.published_at, "%Y-%m-%dT%H:%M:%SZ")
+                        if published > EPOCH:
+                            # Backlog articles are old before the first poll; only time new ones
+                            delays.append(minute - int((published - EPOCH).total_seconds()) // 60)
+                    processed[keyword].add(article.url)
+        watchlist.conn.close()
+
+    published = sum(
+        1 for keyword, articles in feed.articles.items() for article in articles
+        if article.published_at <= last_polled.get(keyword, "")
+    )
+    return {
+        "newsapi_calls": feed.calls,
+        "articles_transferred": feed.articles_sent,
+        "kib_transferred": round(feed.bytes_sent / 1024, 1),
+        "reprocessed": reprocessed,
+        "missed": published - sum(len(urls) for urls in processed.values()),
+        "mean_delay_minutes": round(sum(delays) / len(delays), 1) if delays else 0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--keywords", type=int, default=20)
+    parser.add_argument("--polls", type=int, default=96, help="polls per keyword")
+    parser.add_argument("--interval-minutes", type=int, default=15)
+    parser.add_argument("--arrivals", type=float, default=3, help="mean new articles per keyword per interval")
+    parser.add_argument("--skew", type=float, default=1.0, help="Zipf exponent spreading --arrivals over keywords")
+    parser.add_argument("--max-interval-factor", type=float, default=8,
+                        help="adaptive polling backs quiet keywords off to this many intervals")
+    parser.add_argument("--backlog", type=int, default=100, help="articles per keyword before the first poll")
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    results = {strategy: run(args, strategy) for strategy in ("naive", "watchlist", "adaptive")}
+    columns = list(results["naive"])
+    print(f"{'strategy':<12}" + "".join(f"{column:>22}" for column in columns))
+    for strategy, result in results.items():
+        print(f"{strategy:<12}" + "".join(f"{result[column]:>22}" for column in columns))
+
+    if not args.no_save:
+        save_results("watchlist", results, vars(args))
+
+
+if __name__ == "__main__":
+    main()
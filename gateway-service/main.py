@@ -1,7 +1,21 @@
+import sys
+from pathlib import Path
+
+# Repository root, for the shared instrumentation package
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
 from fastapi import FastAPI
+from shared.instrumentation import configure, instrument_app
+
+# Before the router import so its pooled client is labelled with this service
+configure("gateway-service")
+
 from router import prompt_routing
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+
 app = FastAPI()
+instrument_app(app)
 
 app.add_middleware(
     CORSMiddleware,
@@ -10,9 +24,14 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
 
 app.include_router(prompt_routing.prompt_router)
 
+@app.on_event("shutdown")
+async def close_clients():
+    await prompt_routing.agent_client.aclose()
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to the FastAPI application"}
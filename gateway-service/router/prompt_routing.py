@@ -1,10 +1,16 @@
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi.responses import Response
+from pydantic import BaseModel, Field
 import httpx
+from shared.instrumentation import TracedAsyncClient
 
 class PromptRequest(BaseModel):
     prompt: str
 
+class ArticleSearchRequest(BaseModel):
+    query: str
+    limit: int = Field(10, ge=1, le=100)
+
 prompt_router = APIRouter(
     tags=["prompts"],
     responses={404: {"description": "Page not found"}},
@@ -12,15 +18,34 @@ prompt_router = APIRouter(
 
 AGENT_SERVICE_URL = "http://localhost:8001"  # Default port for agent-service
 
+# One pooled client for all requests; forwards X-Request-ID to agent-service.
+# httpx asks for gzip and decompresses agent-service's responses transparently.
+agent_client = TracedAsyncClient(pool="agent-service")
+
+def _forward(response: httpx.Response) -> Response:
+    # Pass agent-service's JSON through as bytes rather than parsing and re-encoding it
+    return Response(content=response.content, media_type=response.headers.get("content-type", "application/json"))
+
 @prompt_router.post('/prompt_eng')
 async def read_prompt(request: PromptRequest):
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{AGENT_SERVICE_URL}/process_prompt",
-                json={"prompt": request.prompt}
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await agent_client.post(
+            f"{AGENT_SERVICE_URL}/process_prompt",
+            json={"prompt": request.prompt}
+        )
+        response.raise_for_status()
+        return _forward(response)
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=500, detail=f"Error communicating with agent service: {str(e)}")
+
+@prompt_router.post('/search_articles')
+async def search_articles(request: ArticleSearchRequest):
+    try:
+        response = await agent_client.post(
+            f"{AGENT_SERVICE_URL}/search_articles",
+            json={"query": request.query, "limit": request.limit}
+        )
+        response.raise_for_status()
+        return _forward(response)
     except httpx.HTTPError as e:
         raise HTTPException(status_code=500, detail=f"Error communicating with agent service: {str(e)}")
\ No newline at end of file
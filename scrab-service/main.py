@@ -1,33 +1,139 @@
-# main.py (or wherever you want to run the scraper)
-from services.scrabber_agent import ScrabberAgent
+import asyncio
+import logging
+import os
+import sys
+from pathlib import Path
+
+# Repository root, for the shared instrumentation package
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+from typing import List
+from shared.instrumentation import POOL_IN_USE, POOL_SIZE, configure, get_request_id, instrument_app
+
+configure("scrab-service")
+
+from services.job_queue import JobQueue
+from services.scrape_workers import WorkerPool
+
+logger = logging.getLogger(__name__)
+
+AGENT_SERVICE_URL = "http://localhost:8001"  # agent-service keeps the article search index
+JOB_DB_PATH = os.getenv("SCRAPE_JOB_DB", "data/scrape_jobs.sqlite3")
+SCRAPE_WORKERS = int(os.getenv("SCRAPE_WORKERS", os.cpu_count() or 1))
+SCRAPE_CONCURRENCY = int(os.getenv("SCRAPE_CONCURRENCY", 8))
+SCRAPE_JOB_TIMEOUT = float(os.getenv("SCRAPE_JOB_TIMEOUT", 300))
+
+app = FastAPI(
+    title="Scrab Service",
+    description="Queues and runs full-text extraction for article URLs",
+    version="1.0.0"
+)
+instrument_app(app)
+
+Path(JOB_DB_PATH).parent.mkdir(parents=True, exist_ok=True)
+job_queue = JobQueue(JOB_DB_PATH)
+worker_pool = WorkerPool(
+    JOB_DB_PATH,
+    workers=SCRAPE_WORKERS,
+    concurrency=SCRAPE_CONCURRENCY,
+    job_timeout=SCRAPE_JOB_TIMEOUT,
+    index_url=f"{AGENT_SERVICE_URL}/index_articles"
+)
+
+class SubmitJobsRequest(BaseModel):
+    urls: List[str]
+    priority: int = 0
+    use_llm: bool = False
+
+class JobStatusRequest(BaseModel):
+    ids: List[int]
+
+async def _report_pool_usage():
+    # Workers live in other processes; publish their saturation from here
+    while True:
+        POOL_SIZE.labels("scrab-service", "scrape-workers").set(worker_pool.workers * worker_pool.concurrency)
+        POOL_IN_USE.labels("scrab-service", "scrape-workers").set(job_queue.stats()["running"])
+        await asyncio.sleep(5)
+
+@app.on_event("startup")
+async def start_workers():
+    worker_pool.start()
+    app.state.pool_reporter = asyncio.create_task(_report_pool_usage())
+
+@app.on_event("shutdown")
+async def stop_workers():
+    app.state.pool_reporter.cancel()
+    await asyncio.to_thread(worker_pool.stop)
+    job_queue.close()
+
+@app.post("/jobs")
+async def submit_jobs(request: SubmitJobsRequest):
+    try:
+        jobs = job_queue.submit(
+            request.urls,
+            priority=request.priority,
+            options={"use_llm": request.use_llm},
+            request_id=get_request_id()
+        )
+        logger.info("queued scrape jobs", extra={"count": len(jobs)})
+
+        return {
+            "status": "success",
+            "jobs": [{"id": job["id"], "url": job["url"], "status": job["status"]} for job in jobs]
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/jobs/status")
+async def jobs_status(request: JobStatusRequest):
+    try:
+        return {
+            "status": "success",
+            "jobs": job_queue.get_many(request.ids)
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/jobs/stats")
+async def jobs_stats():
+    return {
+        "status": "success",
+        "jobs": job_queue.stats(),
+        "workers_alive": worker_pool.alive()
+    }
+
+@app.get("/jobs/dead")
+async def dead_jobs(limit: int = 50):
+    return {
+        "status": "success",
+        "jobs": job_queue.dead_letters(limit=limit)
+    }
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: int):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return {
+        "status": "success",
+        "job": job
+    }
+
+@app.post("/jobs/{job_id}/retry")
+async def retry_job(job_id: int):
+    if not job_queue.retry(job_id):
+        raise HTTPException(status_code=404, detail=f"Job {job_id} is not dead-lettered")
+    return {
+        "status": "success",
+        "job": job_queue.get(job_id)
+    }
+
 
 if __name__ == "__main__":
-    # Example URLs (replace with actual URLs you want to scrape)
-    urls_to_scrape = [
-        "https://www.cnn.com/2025/05/30/politics/supreme-court-trump-deportations-parole",
-    ]
-
-    # Initialize the scraper agent
-    scraper = ScrabberAgent(links=urls_to_scrape)
-
-    # Get the articles
-    articles = scraper.get_articles()
-
-    # Process the extracted articles
-    if articles:
-        print("\n--- Extracted Articles Summary ---")
-        for i, article in enumerate(articles):
-            print(f"Article {i+1}:")
-            print(f"  Title: {article.get('title', 'N/A')}")
-            print(f"  Author: {article.get('author', 'N/A')}")
-            print(f"  Date: {article.get('publication_date', 'N/A')}")
-            print(f"  URL: {article.get('url', 'N/A')}")
-            print(f"  Content Snippet: {article.get('content', 'N/A')[:150]}...") # Show first 150 chars
-            print("-" * 30)
-    else:
-        print("\nNo articles were extracted.")
-
-    # You can now save `articles` to a database, a JSON file, etc.
-    # with open("extracted_articles.json", "w", encoding="utf-8") as f:
-    #     json.dump(articles, f, indent=4, ensure_ascii=False)
-    # print("\nExtracted articles saved to extracted_articles.json")
\ No newline at end of file
+    import uvicorn
+
+    uvicorn.run("main:app", port=8002, log_level="info")
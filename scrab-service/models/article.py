@@ -1,12 +1,5 @@
 # models/article.py
-from typing import TypedDict, Optional
+# Articles are shared with agent-service and gateway-service; see shared/articles.py
+from shared.articles import Article, to_article
 
-class Article(TypedDict):
-    """
-    Represents the structured data for a single article.
-    """
-    title: str
-    author: Optional[str]
-    publication_date: Optional[str]
-    content: str
-    url: Optional[str]
\ No newline at end of file
+__all__ = ["Article", "to_article"]
@@ -6,6 +6,11 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 import re
 import time
+import logging
+
+from models.article import Article
+
+logger = logging.getLogger(__name__)
 
 class HTMLCleaner:
     def __init__(self) -> None:
@@ -35,7 +40,54 @@ class HTMLCleaner:
             return None
         
         soup = BeautifulSoup(html_content, "lxml")
+        return self._extract_text(soup)
+
+    def extract_article(self, html_content: str, source_url: Optional[str] = None) -> Optional[Article]:
+        """
+        Extracts an Article from raw HTML without calling an LLM.
+
+        Title, canonical URL, author and publication date come from the page's
+        meta tags; content is the same text clean_html() returns.
+
+        Args:
+            html_content (str): Raw HTML of the page.
+            source_url (Optional[str]): URL the page was fetched from, used when
+                                        the page has no canonical URL.
+
+        Returns:
+            Optional[Article]: The article, or None if no text could be extracted.
+        """
+        if not html_content:
+            return None
+
+        soup = BeautifulSoup(html_content, "lxml")
+
+        # Read metadata first; the cleaning pass removes <meta> and <link> tags
+        canonical = soup.find("link", rel="canonical")
+        time_tag = soup.find("time", datetime=True)
+        title = self._meta(soup, property="og:title") or (soup.title.get_text(strip=True) if soup.title else None)
+        url = (canonical.get("href") if canonical else None) or self._meta(soup, property="og:url") or source_url
+        author = self._meta(soup, name="author")
+        publication_date = self._meta(soup, property="article:published_time") or (time_tag["datetime"] if time_tag else None)
+
+        content = self._extract_text(soup)
+        if not content:
+            return None
+
+        return Article(
+            title=title or "",
+            author=author,
+            published_at=publication_date,
+            content=content,
+            url=url,
+        )
+
+    @staticmethod
+    def _meta(soup: BeautifulSoup, **attrs) -> Optional[str]:
+        tag = soup.find("meta", attrs=attrs)
+        return tag.get("content") if tag else None
 
+    def _extract_text(self, soup: BeautifulSoup) -> Optional[str]:
         # Remove HTML comments
         for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
             comment.extract()
@@ -52,12 +104,11 @@ class HTMLCleaner:
             if article_body_element:
                 break # Found a potential article body, stop searching
         
-        cleaned_text = ""
         if article_body_element:
-            cleaned_text = article_body_element.get_text(separator='\n', strip=True)
+            return article_body_element.get_text(separator='\n', strip=True)
         else:
-            print("Warning: Could not find a clear article body element. Extracting all body text.")
-            return soup.body.get_text(separator='\n', strip=True)
+            logger.warning("no article body element found; extracting all body text")
+            return (soup.body or soup).get_text(separator='\n', strip=True)
 
 def get_dynamic_html(url:str, wait_time: int = 5) -> str:
     options = Options()
@@ -0,0 +1,280 @@
+# job_queue.py
+import json
+import random
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urldefrag, urlsplit
+
+# Job lifecycle: queued -> running -> done, or back to queued with a backoff
+# delay on a retryable failure, or dead once max_attempts is exhausted.
+# An expired lease counts as a failed attempt.
+LEASE_EXPIRED = "lease expired"
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+DEAD = "dead"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL UNIQUE,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    options TEXT NOT NULL DEFAULT '{}',
+    request_id TEXT,
+    next_run_at REAL NOT NULL,
+    leased_until REAL,
+    worker TEXT,
+    last_error TEXT,
+    result TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, priority DESC, next_run_at, id);
+"""
+
+
+def normalize_url(url: str) -> str:
+    """Strip whitespace and the #fragment so the same page is only queued once."""
+    return urldefrag(url.strip())[0]
+
+
+def is_fetchable(url: str) -> bool:
+    """An http(s) URL with a host and a valid port, so a fetch can at least be attempted."""
+    try:
+        parts = urlsplit(url)
+        parts.port
+    except ValueError:
+        return False
+    return parts.scheme in ("http", "https") and bool(parts.hostname)
+
+
+class JobQueue:
+    """
+    Durable scrape job queue backed by a local SQLite database.
+
+    Safe to share between processes: each process opens its own JobQueue on
+    the same path, and claims run in an IMMEDIATE transaction so a job is
+    leased to exactly one worker. Workers renew their leases with
+    heartbeat(); a worker that dies or hangs mid-job loses its lease after
+    lease_seconds, which counts as a failed attempt, so a URL that keeps
+    killing workers ends up dead-lettered. complete() and fail() only apply
+    while the caller still holds the lease.
+    """
+    def __init__(self, path: str, max_attempts: int = 4, backoff_base: float = 2.0,
+                 backoff_cap: float = 300.0, lease_seconds: float = 120.0) -> None:
+        self.path = path
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.lease_seconds = lease_seconds
+
+        # Autocommit mode; multi-statement operations open their own transaction
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict:
+        job = dict(row)
+        job["options"] = json.loads(job["options"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def submit(self, urls: Iterable[str], priority: int = 0, options: Optional[Dict] = None,
+               request_id: Optional[str] = None) -> List[Dict]:
+        """
+        Queue a scrape job per URL.
+
+        A URL that is already known keeps its existing job; if that job is
+        still waiting, its priority is raised to `priority` when higher.
+
+        Returns:
+            The job for every submitted URL, in submission order.
+
+        Raises:
+            ValueError: If any URL is not a fetchable http(s) URL; nothing is queued.
+        """
+        now = time.time()
+        normalized = list(dict.fromkeys(normalize_url(url) for url in urls if url and url.strip()))
+        invalid = [url for url in normalized if not is_fetchable(url)]
+        if invalid:
+            raise ValueError(f"Not fetchable http(s) URLs: {', '.join(invalid[:10])}")
+        options_json = json.dumps(options or {})
+
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.executemany(
+                """
+                INSERT INTO jobs (url, priority, status, options, request_id, next_run_at, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    priority = MAX(priority, excluded.priority),
+                    updated_at = excluded.updated_at
+                WHERE status = 'queued'
+                """,
+                [(url, priority, QUEUED, options_json, request_id, now, now, now) for url in normalized]
+            )
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+
+        jobs = {}
+        for offset in range(0, len(normalized), 500):
+            chunk = normalized[offset:offset + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for row in self.conn.execute(f"SELECT * FROM jobs WHERE url IN ({placeholders})", chunk):
+                jobs[row["url"]] = self._to_dict(row)
+        return [jobs[url] for url in normalized]
+
+    def _record_failure(self, job_id: int, attempts: int, error: str, retry: bool, now: float) -> str:
+        # Caller holds the write transaction; `attempts` excludes this failure
+        attempts += 1
+        if retry and attempts < self.max_attempts:
+            delay = min(self.backoff_cap, self.backoff_base * 2 ** (attempts - 1))
+            status, next_run_at = QUEUED, now + delay * random.uniform(0.5, 1.0)
+        else:
+            status, next_run_at = DEAD, now
+        self.conn.execute(
+            "UPDATE jobs SET status = ?, attempts = ?, last_error = ?, next_run_at = ?, "
+            "leased_until = NULL, updated_at = ? WHERE id = ?",
+            (status, attempts, error[:1000], next_run_at, now, job_id)
+        )
+        return status
+
+    def claim(self, worker: str, limit: int = 1) -> List[Dict]:
+        """
+        Lease up to `limit` runnable jobs to `worker`, highest priority first.
+
+        Jobs whose lease has expired are first recorded as failed attempts
+        and go through the same backoff or dead-letter path as fail().
+        """
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            expired = self.conn.execute(
+                "SELECT id, attempts FROM jobs WHERE status = ? AND leased_until < ?", (RUNNING, now)
+            ).fetchall()
+            for row in expired:
+                self._record_failure(row["id"], row["attempts"], LEASE_EXPIRED, True, now)
+
+            rows = self.conn.execute(
+                """
+                SELECT id FROM jobs
+                WHERE status = 'queued' AND next_run_at <= ?
+                ORDER BY priority DESC, next_run_at, id
+                LIMIT ?
+                """,
+                (now, limit)
+            ).fetchall()
+            ids = [row["id"] for row in rows]
+            if ids:
+                placeholders = ",".join("?" * len(ids))
+                self.conn.execute(
+                    f"UPDATE jobs SET status = ?, worker = ?, leased_until = ?, updated_at = ? WHERE id IN ({placeholders})",
+                    [RUNNING, worker, now + self.lease_seconds, now, *ids]
+                )
+                claimed = self.conn.execute(
+                    f"SELECT * FROM jobs WHERE id IN ({placeholders}) ORDER BY priority DESC, next_run_at, id", ids
+                ).fetchall()
+            else:
+                claimed = []
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return [self._to_dict(row) for row in claimed]
+
+    def heartbeat(self, job_id: int, worker: str) -> bool:
+        """
+        Extend `worker`'s lease on a running job by lease_seconds.
+
+        Returns:
+            False if the worker no longer holds the lease.
+        """
+        now = time.time()
+        cursor = self.conn.execute(
+            "UPDATE jobs SET leased_until = ?, updated_at = ? WHERE id = ? AND status = ? AND worker = ?",
+            (now + self.lease_seconds, now, job_id, RUNNING, worker)
+        )
+        return cursor.rowcount > 0
+
+    def complete(self, job_id: int, worker: str, result: Dict) -> bool:
+        """
+        Store the result of a job leased to `worker`.
+
+        Returns:
+            False if the lease was lost (expired and possibly re-leased), in
+            which case the result is discarded.
+        """
+        now = time.time()
+        cursor = self.conn.execute(
+            "UPDATE jobs SET status = ?, result = ?, attempts = attempts + 1, leased_until = NULL, "
+            "last_error = NULL, updated_at = ? WHERE id = ? AND status = ? AND worker = ?",
+            (DONE, json.dumps(result), now, job_id, RUNNING, worker)
+        )
+        return cursor.rowcount > 0
+
+    def fail(self, job_id: int, worker: str, error: str, retry: bool = True) -> Optional[str]:
+        """
+        Record a failed attempt of a job leased to `worker`.
+
+        Retryable failures go back to the queue with exponential backoff and
+        jitter; after max_attempts, or when retry is False, the job is
+        dead-lettered.
+
+        Returns:
+            The job's new status, or None if the lease was lost.
+        """
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute(
+                "SELECT attempts FROM jobs WHERE id = ? AND status = ? AND worker = ?", (job_id, RUNNING, worker)
+            ).fetchone()
+            status = self._record_failure(job_id, row["attempts"], error, retry, now) if row else None
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return status
+
+    def retry(self, job_id: int) -> bool:
+        """Put a dead-lettered job back in the queue with a fresh attempt budget."""
+        now = time.time()
+        cursor = self.conn.execute(
+            "UPDATE jobs SET status = ?, attempts = 0, next_run_at = ?, updated_at = ? WHERE id = ? AND status = ?",
+            (QUEUED, now, now, job_id, DEAD)
+        )
+        return cursor.rowcount > 0
+
+    def get(self, job_id: int) -> Optional[Dict]:
+        row = self.conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def get_many(self, job_ids: List[int]) -> List[Dict]:
+        if not job_ids:
+            return []
+        placeholders = ",".join("?" * len(job_ids))
+        rows = self.conn.execute(f"SELECT * FROM jobs WHERE id IN ({placeholders}) ORDER BY id", job_ids)
+        return [self._to_dict(row) for row in rows]
+
+    def dead_letters(self, limit: int = 50) -> List[Dict]:
+        rows = self.conn.execute(
+            "SELECT * FROM jobs WHERE status = ? ORDER BY updated_at DESC LIMIT ?", (DEAD, limit)
+        )
+        return [self._to_dict(row) for row in rows]
+
+    def stats(self) -> Dict[str, int]:
+        counts = {QUEUED: 0, RUNNING: 0, DONE: 0, DEAD: 0}
+        for row in self.conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status"):
+            counts[row["status"]] = row["n"]
+        return counts
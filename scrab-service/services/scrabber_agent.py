@@ -3,15 +3,21 @@ import requests
 from typing import List
 import google.generativeai as genai
 import json
+import logging
 import os
 from dotenv import load_dotenv
 
-# Import the Article TypedDict from your models module
-from models.article import Article
+from shared.articles import DecodeError
+from shared.instrumentation import record_llm_usage, span
+
+# Import the Article type from your models module
+from models.article import Article, to_article
 
 # Load environment variables from .env file (e.g., GOOGLE_API_KEY)
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 class ScrabberAgent:
     """
     A class that handles the scraping of article content from multiple URLs
@@ -29,8 +35,14 @@ class ScrabberAgent:
         self.all_articles: List[Article] = []
 
         # Initialize Gemini model
+        # GEMINI_API_ENDPOINT points the client at a local stand-in (benchmarks/fake_upstreams.py)
+        endpoint = os.getenv('GEMINI_API_ENDPOINT')
         try:
-            genai.configure(api_key=os.getenv('GOOGLE_API_KEY'))
+            genai.configure(
+                api_key=os.getenv('GOOGLE_API_KEY'),
+                transport='rest' if endpoint else None,
+                client_options={'api_endpoint': endpoint} if endpoint else None
+            )
             self.gemini_model = genai.GenerativeModel('gemini-pro')
             # Optional: Test a small prompt to ensure API key is valid
             # self.gemini_model.generate_content("hello") 
@@ -45,43 +57,44 @@ class ScrabberAgent:
         Returns:
             List[Article]: A list of all extracted article dictionaries.
         """
-        print(f"Starting scraping process for {len(self.links)} URLs...")
+        logger.info("starting scrape", extra={"url_count": len(self.links)})
         for url in self.links:
-            print(f"\n--- Processing URL: {url} ---")
+            logger.info("processing url", extra={"url": url})
             try:
                 # Make an HTTP GET request to fetch the HTML content
                 # Added timeout for robustness and raise_for_status for immediate HTTP error handling
-                response = requests.get(url=url, timeout=15) # Increased timeout slightly
-                print(response.text, "\n\n")
-                response.raise_for_status() # Raises HTTPError for 4xx/5xx responses
+                with span("fetch"):
+                    response = requests.get(url=url, timeout=15) # Increased timeout slightly
+                    response.raise_for_status() # Raises HTTPError for 4xx/5xx responses
+                logger.debug("fetched page", extra={"url": url, "bytes": len(response.content)})
                 
                 # Pass the HTML content to the internal scraper agent
                 # The _scrabber_agent returns a List[Article]
-                extracted_data_for_url = self._scrabber_agent(
-                    html_content=response.text, 
-                    source_url=url
-                )
+                with span("llm_extract"):
+                    extracted_data_for_url = self._scrabber_agent(
+                        html_content=response.text, 
+                        source_url=url
+                    )
                 
                 # If Gemini successfully extracted articles, add them to the main list
                 if extracted_data_for_url:
                     self.all_articles.extend(extracted_data_for_url)
-                    print(f"Successfully extracted {len(extracted_data_for_url)} article(s) from {url}")
+                    logger.info("extracted articles", extra={"url": url, "article_count": len(extracted_data_for_url)})
                 else:
-                    print(f"No article data extracted from {url}. It might not be an article page or content is too complex.")
+                    logger.warning("no article data extracted; not an article page or content too complex", extra={"url": url})
 
             except requests.exceptions.HTTPError as e:
-                print(f"ERROR: HTTP Error {e.response.status_code} for {url}: {e.response.reason}")
+                logger.error("HTTP error", extra={"url": url, "status": e.response.status_code, "reason": e.response.reason})
             except requests.exceptions.ConnectionError as e:
-                print(f"ERROR: Connection Error for {url}: {e}")
+                logger.error("connection error", extra={"url": url, "error": str(e)})
             except requests.exceptions.Timeout as e:
-                print(f"ERROR: Timeout occurred while fetching {url}: {e}")
+                logger.error("timeout while fetching", extra={"url": url, "error": str(e)})
             except requests.exceptions.RequestException as e:
-                print(f"ERROR: An unexpected request error occurred for {url}: {e}")
-            except Exception as e:
-                print(f"ERROR: An unhandled exception occurred for {url}: {e}")
+                logger.error("unexpected request error", extra={"url": url, "error": str(e)})
+            except Exception:
+                logger.exception("unhandled exception", extra={"url": url})
         
-        print("\n--- Scraping process completed ---")
-        print(f"Total articles extracted: {len(self.all_articles)}")
+        logger.info("scrape completed", extra={"article_count": len(self.all_articles)})
         return self.all_articles
 
     def _scrabber_agent(self, html_content: str, source_url: str) -> List[Article]:
@@ -100,7 +113,7 @@ class ScrabberAgent:
                            if no articles are found or if an error occurs during extraction.
         """
         if not html_content:
-            print("Warning: Received empty HTML content for scraping.")
+            logger.warning("received empty HTML content", extra={"url": source_url})
             return []
         
         article_schema = {
@@ -114,7 +127,7 @@ class ScrabberAgent:
                     "content": {"type": "string", "description": "The complete, main body text of the article, excluding non-article elements."},
                     "url": {"type": ["string", "null"], "description": "The canonical URL of the article. Prioritize from HTML meta tags, otherwise use source_url. Null if not found."},
                 },
-                "required": ["title", "content"] # Define required fields based on your Article TypedDict
+                "required": ["title", "content"] # Define required fields based on the Article type
             }
         }
         
@@ -153,10 +166,11 @@ class ScrabberAgent:
                 # Optional: request_options to set timeout for Gemini API call
                 # request_options={'timeout': 180} 
             )
+            record_llm_usage('gemini-pro', response)
 
             # Check if Gemini returned any text, which should be JSON
             if not hasattr(response, 'text') or not response.text:
-                print(f"Warning: Gemini response was empty or did not contain text for URL: {source_url}")
+                logger.warning("empty Gemini response", extra={"url": source_url})
                 return []
             
             # Attempt to parse the JSON string from Gemini's response
@@ -164,25 +178,30 @@ class ScrabberAgent:
             
             # Validate that the parsed data is a list (as requested in the prompt)
             if not isinstance(extracted_raw_data, list):
-                print(f"Warning: Gemini returned an unexpected type ({type(extracted_raw_data)}), expected a list for URL: {source_url}. Raw: {response.text[:200]}...")
+                logger.warning("Gemini returned a non-list payload", extra={"url": source_url, "type": type(extracted_raw_data).__name__, "raw": response.text[:200]})
                 return []
 
-            # Validate each item in the list against the Article TypedDict structure
+            # Validate each item and convert it to an Article
             validated_articles: List[Article] = []
             for item in extracted_raw_data:
                 # Basic validation: check if it's a dict and has at least a title/content
+                article = None
                 if isinstance(item, dict) and 'title' in item and 'content' in item:
-                    # You could add more sophisticated validation here if needed
-                    # For TypedDict, Python's type checker would ideally handle this
-                    validated_articles.append(item)
+                    try:
+                        article = to_article(item)
+                    except DecodeError:
+                        # A field of the wrong type, e.g. a number for the title
+                        pass
+                if article is not None:
+                    validated_articles.append(article)
                 else:
-                    print(f"Warning: Skipping malformed article item from Gemini for {source_url}: {item}")
+                    logger.warning("skipping malformed article item", extra={"url": source_url, "item": item})
             
             return validated_articles
 
         except json.JSONDecodeError as e:
-            print(f"ERROR: Gemini did not return valid JSON for {source_url}. Error: {e}\nRaw response (first 500 chars): {response.text[:500]}...")
+            logger.error("Gemini did not return valid JSON", extra={"url": source_url, "error": str(e), "raw": response.text[:500]})
             return []
-        except Exception as e:
-            print(f"ERROR: An unhandled exception occurred during Gemini extraction for {source_url}: {e}")
+        except Exception:
+            logger.exception("unhandled exception during Gemini extraction", extra={"url": source_url})
             return []
\ No newline at end of file
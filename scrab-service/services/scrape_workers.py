@@ -0,0 +1,244 @@
+# scrape_workers.py
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from shared.articles import JSON_HEADERS, ArticleBatch, encode, to_dicts
+from shared.instrumentation import configure, outgoing_headers, set_request_id, span
+
+from models.article import Article
+from services.cleaning_parser import HTMLCleaner
+from services.job_queue import JobQueue
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# 404/410 and friends will not get better on retry; dead-letter them at once
+RETRYABLE_STATUS = {408, 425, 429}
+
+
+class _Worker:
+    """
+    One worker process: leases jobs from the queue and keeps up to
+    `concurrency` of them in flight. Fetching is async; HTML cleaning runs
+    inline since the process has a core to itself.
+
+    Leases are renewed while a job runs, so slow `use_llm` extractions keep
+    their job; a job still running after `job_timeout` seconds is failed
+    and retried instead.
+    """
+    def __init__(self, db_path: str, name: str, concurrency: int, poll_interval: float, job_timeout: float,
+                 index_url: Optional[str], index_batch_size: int, drain: bool, stop_event) -> None:
+        self.queue = JobQueue(db_path)
+        self.name = name
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.job_timeout = job_timeout
+        self.index_url = index_url
+        self.index_batch_size = index_batch_size
+        self.drain = drain
+        self.stop_event = stop_event
+
+        self.cleaner = HTMLCleaner()
+        self._scrabber = None
+        self._to_index: List[Article] = []
+
+    def _llm_extract(self, html_content: str, url: str) -> List[Article]:
+        if self._scrabber is None:
+            # Only workers that see use_llm jobs pay for the Gemini client
+            from services.scrabber_agent import ScrabberAgent
+            self._scrabber = ScrabberAgent(links=[])
+        return self._scrabber._scrabber_agent(html_content=html_content, source_url=url)
+
+    async def _keep_leased(self, job_id: int) -> None:
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds / 3)
+            if not self.queue.heartbeat(job_id, self.name):
+                return
+
+    async def _process(self, client: httpx.AsyncClient, job: Dict) -> None:
+        set_request_id(job.get("request_id"))
+        heartbeat = asyncio.create_task(self._keep_leased(job["id"]))
+        try:
+            await asyncio.wait_for(self._run_job(client, job), self.job_timeout)
+        except asyncio.TimeoutError:
+            # A Gemini call in a thread cannot be interrupted; its result is discarded
+            status = self.queue.fail(job["id"], self.name, f"timed out after {self.job_timeout:.0f}s")
+            logger.warning("job timed out", extra={"url": job["url"], "job_status": status})
+        except Exception as e:
+            # Otherwise the job would sit running until its lease expired
+            status = self.queue.fail(job["id"], self.name, f"{type(e).__name__}: {e}")
+            logger.exception("job failed", extra={"url": job["url"], "job_status": status})
+        finally:
+            heartbeat.cancel()
+
+    async def _run_job(self, client: httpx.AsyncClient, job: Dict) -> None:
+        url = job["url"]
+        try:
+            with span("fetch"):
+                response = await client.get(url)
+                response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            code = e.response.status_code
+            status = self.queue.fail(job["id"], self.name, f"HTTP {code}", retry=code >= 500 or code in RETRYABLE_STATUS)
+            logger.warning("fetch failed", extra={"url": url, "status": code, "job_status": status})
+            return
+        except (httpx.InvalidURL, httpx.UnsupportedProtocol) as e:
+            # Also raised for redirects to e.g. ftp://; the URL will not fetch on retry
+            status = self.queue.fail(job["id"], self.name, f"{type(e).__name__}: {e}", retry=False)
+            logger.warning("fetch failed", extra={"url": url, "error": str(e), "job_status": status})
+            return
+        except httpx.HTTPError as e:
+            status = self.queue.fail(job["id"], self.name, f"{type(e).__name__}: {e}")
+            logger.warning("fetch failed", extra={"url": url, "error": str(e), "job_status": status})
+            return
+
+        try:
+            if job["options"].get("use_llm"):
+                with span("llm_extract"):
+                    articles = await asyncio.to_thread(self._llm_extract, response.text, url)
+            else:
+                with span("clean"):
+                    article = self.cleaner.extract_article(response.text, source_url=url)
+                articles = [article] if article else []
+        except Exception as e:
+            self.queue.fail(job["id"], self.name, f"{type(e).__name__}: {e}")
+            logger.exception("extraction failed", extra={"url": url})
+            return
+
+        if not self.queue.complete(job["id"], self.name, {"articles": to_dicts(articles)}):
+            # The lease expired and the job was taken back; that attempt owns the result
+            logger.warning("lost lease before completing job", extra={"url": url})
+            return
+        self._to_index.extend(articles)
+
+    async def _flush_index(self, client: httpx.AsyncClient, force: bool = False) -> None:
+        """Send extracted articles to agent-service's search index in batches."""
+        if not self.index_url or not self._to_index:
+            return
+        if not force and len(self._to_index) < self.index_batch_size:
+            return
+        batch, self._to_index = self._to_index, []
+        try:
+            response = await client.post(
+                self.index_url,
+                content=encode(ArticleBatch(articles=batch)),
+                headers={**JSON_HEADERS, **outgoing_headers()}
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            # Results are in the queue database either way; indexing is best effort
+            logger.warning("could not index scraped articles", extra={"count": len(batch), "error": str(e)})
+
+    async def run(self) -> None:
+        limits = httpx.Limits(max_connections=self.concurrency * 2)
+        headers = {"User-Agent": USER_AGENT}
+        async with httpx.AsyncClient(timeout=15, limits=limits, headers=headers, follow_redirects=True) as client:
+            in_flight = set()
+            last_flush = time.monotonic()
+            while not self.stop_event.is_set():
+                free = self.concurrency - len(in_flight)
+                jobs = self.queue.claim(self.name, limit=free) if free else []
+                for job in jobs:
+                    in_flight.add(asyncio.create_task(self._process(client, job)))
+
+                if in_flight:
+                    _, in_flight = await asyncio.wait(
+                        in_flight, timeout=self.poll_interval, return_when=asyncio.FIRST_COMPLETED
+                    )
+                else:
+                    await self._flush_index(client, force=True)
+                    if self.drain:
+                        stats = self.queue.stats()
+                        if not stats["queued"] and not stats["running"]:
+                            break
+                    await asyncio.sleep(self.poll_interval)
+
+                if time.monotonic() - last_flush > 5:
+                    await self._flush_index(client, force=True)
+                    last_flush = time.monotonic()
+                else:
+                    await self._flush_index(client)
+
+            if in_flight:
+                await asyncio.wait(in_flight)
+            await self._flush_index(client, force=True)
+        self.queue.close()
+
+
+def _run_worker(db_path: str, name: str, concurrency: int, poll_interval: float, job_timeout: float,
+                index_url: Optional[str], index_batch_size: int, drain: bool, stop_event) -> None:
+    configure("scrab-service")
+    worker = _Worker(db_path, name, concurrency, poll_interval, job_timeout, index_url, index_batch_size, drain, stop_event)
+    asyncio.run(worker.run())
+
+
+class WorkerPool:
+    """
+    A pool of scrape worker processes sharing one JobQueue database.
+
+    Each process runs its own event loop for fetching, so HTML cleaning
+    spreads across cores while the network I/O stays async.
+    """
+    def __init__(self, db_path: str, workers: Optional[int] = None, concurrency: int = 8,
+                 poll_interval: float = 0.2, job_timeout: float = 300.0,
+                 index_url: Optional[str] = None, index_batch_size: int = 50) -> None:
+        self.db_path = db_path
+        self.workers = workers or os.cpu_count() or 1
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.job_timeout = job_timeout
+        self.index_url = index_url
+        self.index_batch_size = index_batch_size
+
+        # spawn: the parent may be running uvicorn threads, which fork does not copy safely
+        self._context = multiprocessing.get_context("spawn")
+        self._stop_event = self._context.Event()
+        self._processes: List[multiprocessing.Process] = []
+
+    def start(self, drain: bool = False) -> None:
+        """
+        Start the worker processes.
+
+        Args:
+            drain (bool): Exit once the queue has no queued or running jobs,
+                          instead of polling until stop() is called.
+        """
+        # Create the schema once so workers do not race on it
+        JobQueue(self.db_path).close()
+        self._stop_event.clear()
+        for i in range(self.workers):
+            process = self._context.Process(
+                target=_run_worker,
+                args=(self.db_path, f"worker-{os.getpid()}-{i}", self.concurrency, self.poll_interval,
+                      self.job_timeout, self.index_url, self.index_batch_size, drain, self._stop_event),
+                name=f"scrape-worker-{i}",
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
+        logger.info("started scrape workers", extra={"workers": self.workers, "concurrency": self.concurrency})
+
+    def join(self) -> None:
+        for process in self._processes:
+            process.join()
+        self._processes = []
+
+    def stop(self, timeout: float = 30) -> None:
+        """Ask workers to finish their in-flight jobs and exit; terminate stragglers."""
+        self._stop_event.set()
+        deadline = time.monotonic() + timeout
+        for process in self._processes:
+            process.join(max(0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+
+    def alive(self) -> int:
+        return sum(process.is_alive() for process in self._processes)
@@ -0,0 +1,113 @@
+import time
+
+import pytest
+
+from services.job_queue import DEAD, DONE, LEASE_EXPIRED, QUEUED, RUNNING, JobQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    # No backoff delay, so a failed job can be claimed again straight away
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), max_attempts=3, backoff_base=0, lease_seconds=60)
+    yield queue
+    queue.close()
+
+
+def expire_lease(queue, job_id):
+    queue.conn.execute("UPDATE jobs SET leased_until = ? WHERE id = ?", (time.time() - 1, job_id))
+
+
+def test_submit_deduplicates_urls_and_fragments(queue):
+    jobs = queue.submit(["https://example.com/a#top", "https://example.com/a", "https://example.com/b"])
+    assert [job["url"] for job in jobs] == ["https://example.com/a", "https://example.com/b"]
+    assert queue.stats()[QUEUED] == 2
+
+
+def test_retryable_failure_requeues_with_backoff(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), backoff_base=30)
+    [job] = queue.submit(["https://example.com/a"])
+    queue.claim("w1")
+
+    assert queue.fail(job["id"], "w1", "HTTP 503") == QUEUED
+    stored = queue.get(job["id"])
+    assert stored["attempts"] == 1
+    assert stored["next_run_at"] > time.time() + 10
+    assert queue.claim("w1") == []
+    queue.close()
+
+
+def test_dead_letters_after_max_attempts(queue):
+    [job] = queue.submit(["https://example.com/a"])
+    statuses = []
+    for _ in range(3):
+        assert queue.claim("w1")
+        statuses.append(queue.fail(job["id"], "w1", "HTTP 503"))
+
+    assert statuses == [QUEUED, QUEUED, DEAD]
+    assert [dead["id"] for dead in queue.dead_letters()] == [job["id"]]
+    assert queue.claim("w1") == []
+
+
+def test_non_retryable_failure_dead_letters_at_once(queue):
+    [job] = queue.submit(["https://example.com/a"])
+    queue.claim("w1")
+    assert queue.fail(job["id"], "w1", "HTTP 404", retry=False) == DEAD
+
+
+def test_retry_requeues_dead_job_with_fresh_budget(queue):
+    [job] = queue.submit(["https://example.com/a"])
+    queue.claim("w1")
+    queue.fail(job["id"], "w1", "HTTP 404", retry=False)
+
+    assert queue.retry(job["id"])
+    assert queue.get(job["id"])["attempts"] == 0
+    assert [claimed["id"] for claimed in queue.claim("w2")] == [job["id"]]
+    assert not queue.retry(job["id"])
+
+
+def test_expired_lease_counts_as_attempt_and_dead_letters(queue):
+    [job] = queue.submit(["https://example.com/a"])
+    for attempt in range(1, 4):
+        assert [claimed["id"] for claimed in queue.claim(f"w{attempt}")] == [job["id"]]
+        expire_lease(queue, job["id"])
+        # The next claim takes the job back and records the lost attempt
+        queue.claim("observer", limit=0)
+        assert queue.get(job["id"])["attempts"] == attempt
+
+    stored = queue.get(job["id"])
+    assert stored["status"] == DEAD
+    assert stored["last_error"] == LEASE_EXPIRED
+
+
+def test_stale_worker_cannot_overwrite_new_lease(queue):
+    [job] = queue.submit(["https://example.com/a"])
+    queue.claim("slow")
+    expire_lease(queue, job["id"])
+    assert queue.claim("fast")
+
+    assert not queue.complete(job["id"], "slow", {"articles": ["stale"]})
+    assert queue.fail(job["id"], "slow", "late failure") is None
+    assert queue.get(job["id"])["status"] == RUNNING
+
+    assert queue.complete(job["id"], "fast", {"articles": []})
+    stored = queue.get(job["id"])
+    assert stored["status"] == DONE
+    assert stored["result"] == {"articles": []}
+
+
+def test_heartbeat_extends_only_own_lease(queue):
+    [job] = queue.submit(["https://example.com/a"])
+    queue.claim("w1")
+    expire_lease(queue, job["id"])
+
+    assert not queue.heartbeat(job["id"], "w2")
+    assert queue.heartbeat(job["id"], "w1")
+    assert queue.get(job["id"])["leased_until"] > time.time() + 30
+    assert queue.claim("w2") == []
+
+
+@pytest.mark.parametrize("url", ["http://[::1", "ftp://example.com/a", "http://", "https://example.com:99999/a"])
+def test_submit_rejects_unfetchable_urls(queue, url):
+    with pytest.raises(ValueError):
+        queue.submit(["https://example.com/ok", url])
+    assert queue.stats()[QUEUED] == 0
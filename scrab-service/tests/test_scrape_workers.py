@@ -0,0 +1,51 @@
+import asyncio
+
+import httpx
+import pytest
+
+from services.job_queue import DEAD, QUEUED, JobQueue
+from services.scrape_workers import _Worker
+
+
+@pytest.fixture
+def worker(tmp_path):
+    worker = _Worker(str(tmp_path / "jobs.sqlite3"), "w1", concurrency=1, poll_interval=0.1, job_timeout=5,
+                     index_url=None, index_batch_size=50, drain=True, stop_event=None)
+    yield worker
+    worker.queue.close()
+
+
+def claim_with_url(queue: JobQueue, url: str):
+    # submit() rejects these URLs; the worker must still cope with them, e.g. from older rows
+    [job] = queue.submit(["https://example.com/a"])
+    queue.conn.execute("UPDATE jobs SET url = ? WHERE id = ?", (url, job["id"]))
+    [claimed] = queue.claim("w1")
+    return claimed
+
+
+async def process(worker: _Worker, job) -> None:
+    async with httpx.AsyncClient() as client:
+        await worker._process(client, job)
+
+
+@pytest.mark.parametrize("url", ["http://[::1", "ftp://example.com/a"])
+def test_unfetchable_url_is_dead_lettered_at_once(worker, url):
+    job = claim_with_url(worker.queue, url)
+    asyncio.run(process(worker, job))
+
+    stored = worker.queue.get(job["id"])
+    assert (stored["status"], stored["attempts"]) == (DEAD, 1)
+
+
+def test_unexpected_error_fails_the_job(worker, monkeypatch):
+    job = claim_with_url(worker.queue, "https://example.com/a")
+
+    async def broken(client, job):
+        raise RuntimeError("parser bug")
+
+    monkeypatch.setattr(worker, "_run_job", broken)
+    asyncio.run(process(worker, job))
+
+    stored = worker.queue.get(job["id"])
+    assert (stored["status"], stored["attempts"]) == (QUEUED, 1)
+    assert stored["last_error"] == "RuntimeError: parser bug"
@@ -0,0 +1,150 @@
+"""
+The article type passed between gateway-service, agent-service and
+scrab-service, and the msgspec JSON path used to move it.
+
+NewsAPI results and scraped pages are converted once, at the edge:
+
+    articles = [from_newsapi(raw) for raw in response["articles"]]
+    article = to_article(scraped_dict)
+
+and sent or returned without going through dicts again:
+
+    client.post(url, content=encode(ArticleBatch(articles=articles)), headers=JSON_HEADERS)
+    return MsgspecResponse({"status": "success", "results": results})
+"""
+import sys
+from typing import Any, Dict, Iterable, List, Optional
+
+import msgspec
+from fastapi.responses import Response
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+class Article(msgspec.Struct, omit_defaults=True, gc=False, forbid_unknown_fields=True):
+    """
+    A news article, from NewsAPI or extracted from a page.
+
+    Structs are fixed-layout (no per-instance __dict__) and, holding only
+    strings, are left out of garbage collector tracking. Unset fields are
+    omitted from the encoded JSON. Decoding rejects unknown fields, so an
+    article in another shape (NewsAPI's `publishedAt`, the scraper's
+    `publication_date`) is never decoded with those fields silently dropped.
+    """
+    title: str = ""
+    url: Optional[str] = None
+    source: Optional[str] = None
+    author: Optional[str] = None
+    published_at: Optional[str] = None
+    description: Optional[str] = None
+    content: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        # A result set has thousands of articles and a few dozen sources
+        if self.source is not None:
+            self.source = sys.intern(self.source)
+
+
+class ArticleBatch(msgspec.Struct):
+    articles: List[Article]
+
+
+_encoder = msgspec.json.Encoder()
+_batch_decoder = msgspec.json.Decoder(ArticleBatch)
+
+DecodeError = msgspec.DecodeError
+
+
+def _convert(fields: Dict) -> Article:
+    # Unlike Article(...), convert() checks every field is a str (or None)
+    return msgspec.convert(fields, Article)
+
+
+def from_newsapi(raw: Dict) -> Article:
+    """
+    Convert one item of a NewsAPI `articles` list.
+
+    Raises:
+        DecodeError: If a field has the wrong type.
+    """
+    source = raw.get("source")
+    return _convert({
+        "title": raw.get("title") or "",
+        "url": raw.get("url"),
+        "source": source.get("name") if isinstance(source, dict) else source,
+        "author": raw.get("author"),
+        "published_at": raw.get("publishedAt"),
+        "description": raw.get("description"),
+        "content": raw.get("content"),
+    })
+
+
+def to_article(raw: Dict) -> Article:
+    """
+    Convert an article dict in any of the shapes the services have used:
+    NewsAPI's, the scraper's (`publication_date`) or this type's own.
+
+    Raises:
+        DecodeError: If a field has the wrong type.
+    """
+    if "publishedAt" in raw or isinstance(raw.get("source"), dict):
+        return from_newsapi(raw)
+    return _convert({
+        "title": raw.get("title") or "",
+        "url": raw.get("url"),
+        "source": raw.get("source"),
+        "author": raw.get("author"),
+        "published_at": raw.get("published_at") or raw.get("publication_date"),
+        "description": raw.get("description"),
+        "content": raw.get("content"),
+    })
+
+
+def encode(obj: Any) -> bytes:
+    """Encode articles, or dicts and lists containing them, as JSON."""
+    return _encoder.encode(obj)
+
+
+def decode_batch(data: bytes) -> List[Article]:
+    """
+    Decode an ArticleBatch body straight into Articles.
+
+    Raises:
+        DecodeError: If the body is not valid JSON or not an ArticleBatch.
+    """
+    return _batch_decoder.decode(data).articles
+
+
+def decode_articles(data: bytes) -> List[Article]:
+    """
+    Decode a `{"articles": [...]}` body whose items may be in any shape
+    to_article accepts. ArticleBatch bodies take the decode_batch fast path.
+
+    Raises:
+        DecodeError: If the body is not valid JSON, has no list of article
+            objects, or an article field has the wrong type.
+    """
+    try:
+        return decode_batch(data)
+    except DecodeError:
+        raw = msgspec.json.decode(data)
+    items = raw.get("articles") if isinstance(raw, dict) else None
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        raise DecodeError("Expected an object with an `articles` list of article objects")
+    return [to_article(item) for item in items]
+
+
+def to_dicts(articles: Iterable[Article]) -> List[Dict]:
+    """Plain dicts, for code that stores results with the stdlib json module."""
+    return msgspec.to_builtins(list(articles))
+
+
+class MsgspecResponse(Response):
+    """
+    JSON response encoded by msgspec. Return it from a handler directly;
+    FastAPI then skips jsonable_encoder, which walks every value in Python.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return _encoder.encode(content)
@@ -0,0 +1,208 @@
+"""
+Request tracing, per-stage latency metrics and structured logging shared by
+gateway-service, agent-service and scrab-service.
+
+Typical service setup:
+
+    from shared.instrumentation import configure, instrument_app
+    configure("agent-service")
+    instrument_app(app)
+
+and inside request handlers:
+
+    with span("keyword_extraction"):
+        keyword = analyzer.extract_keywords()
+"""
+import json
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+import httpx
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+_request_id: ContextVar[str] = ContextVar("request_id", default="-")
+_service_name = "unknown"
+
+# Stage latencies span four orders of magnitude (tokenizing vs. an LLM call).
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+HTTP_REQUEST_LATENCY = Histogram(
+    "varitas_http_request_duration_seconds",
+    "Latency of inbound HTTP requests",
+    ["service", "method", "route", "status"],
+    buckets=_LATENCY_BUCKETS,
+)
+STAGE_LATENCY = Histogram(
+    "varitas_stage_duration_seconds",
+    "Latency of a pipeline stage",
+    ["service", "stage", "outcome"],
+    buckets=_LATENCY_BUCKETS,
+)
+CACHE_EVENTS = Counter(
+    "varitas_cache_events_total",
+    "Cache lookups by result",
+    ["service", "cache", "result"],
+)
+POOL_IN_USE = Gauge(
+    "varitas_pool_in_use",
+    "Connections or workers currently busy",
+    ["service", "pool"],
+)
+POOL_SIZE = Gauge(
+    "varitas_pool_size",
+    "Configured size of the pool",
+    ["service", "pool"],
+)
+LLM_TOKENS = Counter(
+    "varitas_llm_tokens_total",
+    "Tokens sent to and received from the LLM",
+    ["service", "model", "kind"],
+)
+
+# Attributes every LogRecord has; anything else came in through `extra=`.
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, tagged with the service and request id."""
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "service": _service_name,
+            "logger": record.name,
+            "request_id": _request_id.get(),
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure(service_name: str, level: int = logging.INFO) -> None:
+    """Set the service label used by metrics and route logging through JsonFormatter."""
+    global _service_name
+    _service_name = service_name
+
+    handler = logging.StreamHandler()
+    handler.setFormatter(JsonFormatter())
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(level)
+    # httpx logs every request at INFO; the access log above already covers it
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def get_request_id() -> str:
+    return _request_id.get()
+
+
+def set_request_id(request_id: Optional[str] = None) -> str:
+    """Bind a request id to the current context, generating one if needed."""
+    request_id = request_id or uuid.uuid4().hex
+    _request_id.set(request_id)
+    return request_id
+
+
+def outgoing_headers() -> Dict[str, str]:
+    """Headers to forward on internal service-to-service calls."""
+    request_id = _request_id.get()
+    return {REQUEST_ID_HEADER: request_id} if request_id != "-" else {}
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Time a pipeline stage into varitas_stage_duration_seconds."""
+    start = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        STAGE_LATENCY.labels(_service_name, stage, outcome).observe(time.perf_counter() - start)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_EVENTS.labels(_service_name, cache, "hit" if hit else "miss").inc()
+
+
+def record_llm_usage(model: str, response) -> None:
+    """Count prompt/completion tokens from a Gemini response's usage_metadata."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    prompt_tokens = getattr(usage, "prompt_token_count", 0) or 0
+    completion_tokens = getattr(usage, "candidates_token_count", 0) or 0
+    LLM_TOKENS.labels(_service_name, model, "prompt").inc(prompt_tokens)
+    LLM_TOKENS.labels(_service_name, model, "completion").inc(completion_tokens)
+
+
+class TracedAsyncClient(httpx.AsyncClient):
+    """
+    Long-lived httpx client for internal hops.
+
+    Forwards the current request id and reports in-flight requests against
+    max_connections so pool saturation shows up in /metrics.
+    """
+    def __init__(self, pool: str, max_connections: int = 100, **kwargs) -> None:
+        kwargs.setdefault("limits", httpx.Limits(max_connections=max_connections))
+        kwargs.setdefault("timeout", httpx.Timeout(30.0))
+        super().__init__(**kwargs)
+        self.pool = pool
+        POOL_SIZE.labels(_service_name, pool).set(max_connections)
+
+    async def send(self, request: httpx.Request, **kwargs) -> httpx.Response:
+        for key, value in outgoing_headers().items():
+            request.headers.setdefault(key, value)
+
+        in_use = POOL_IN_USE.labels(_service_name, self.pool)
+        in_use.inc()
+        try:
+            return await super().send(request, **kwargs)
+        finally:
+            in_use.dec()
+
+
+def instrument_app(app) -> None:
+    """Add request id handling, request latency metrics and GET /metrics to a FastAPI app."""
+    from fastapi import Request, Response
+
+    logger = logging.getLogger("http")
+
+    @app.middleware("http")
+    async def trace_requests(request: Request, call_next):
+        request_id = set_request_id(request.headers.get(REQUEST_ID_HEADER))
+        start = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            response.headers[REQUEST_ID_HEADER] = request_id
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            # Route template, not the raw path, to keep label cardinality bounded.
+            route = getattr(request.scope.get("route"), "path", "unmatched")
+            HTTP_REQUEST_LATENCY.labels(_service_name, request.method, route, str(status)).observe(elapsed)
+            if route != "/metrics":
+                logger.info("request finished", extra={
+                    "method": request.method,
+                    "route": route,
+                    "status": status,
+                    "duration_ms": round(elapsed * 1000, 2),
+                })
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)